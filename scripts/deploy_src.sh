@@ -18,6 +18,17 @@ EXCLUDE_FILES=(
     "config.py"  # Old Python config (now using config.json)
 )
 
+# Files precompiled to .mpy with mpy-cross (when available).
+# Precompiled bytecode is smaller on flash, imports without compiling on
+# the board, and -O2 strips docstrings out of the heap.
+MPY_FILES=(
+    "system_status.py"
+    "time_sync.py"
+)
+
+# Both ESP32 and ESP32-S3 ports use the windowed Xtensa ABI
+MPY_ARCH="xtensawin"
+
 echo "=== Deploying Source Code ==="
 echo "Source directory: $SRC_DIR"
 
@@ -33,6 +44,14 @@ echo "Checking connection..."
 echo ""
 echo "Uploading source files..."
 
+# Use mpy-cross precompilation only if the tool is installed
+HAVE_MPY_CROSS=0
+if command -v mpy-cross &> /dev/null; then
+    HAVE_MPY_CROSS=1
+else
+    echo "mpy-cross not found, uploading plain .py (pip install mpy-cross to enable)"
+fi
+
 cd "$SRC_DIR"
 for file in *.py; do
     if [ -f "$file" ]; then
@@ -50,8 +69,29 @@ for file in *.py; do
             continue
         fi
 
-        echo "Uploading $file..."
-        "$REMOTE_SCRIPT" fs cp "$file" ":$file"
+        # Precompile selected modules to .mpy
+        precompile=0
+        if [ $HAVE_MPY_CROSS -eq 1 ]; then
+            for mpy_file in "${MPY_FILES[@]}"; do
+                if [ "$file" == "$mpy_file" ]; then
+                    precompile=1
+                    break
+                fi
+            done
+        fi
+
+        if [ $precompile -eq 1 ]; then
+            mpy_name="${file%.py}.mpy"
+            echo "Compiling and uploading $mpy_name..."
+            mpy-cross -O3 -march="$MPY_ARCH" "$file" -o "/tmp/$mpy_name"
+            "$REMOTE_SCRIPT" fs cp "/tmp/$mpy_name" ":$mpy_name"
+            # Remove any stale .py so the .mpy is the one imported
+            "$REMOTE_SCRIPT" fs rm ":$file" >/dev/null 2>&1 || true
+            rm -f "/tmp/$mpy_name"
+        else
+            echo "Uploading $file..."
+            "$REMOTE_SCRIPT" fs cp "$file" ":$file"
+        fi
     fi
 done
 
@@ -1,4 +1,5 @@
 # boot.py - Runs on every boot
+import uasyncio as asyncio
 from instances import instances
 
 # Initialize all singleton instances
@@ -10,11 +11,18 @@ instances.board.set_cpu_frequency()
 # Set LED to booting state
 instances.led.set_state('booting')
 
+async def sync_time_and_timezone():
+    """Run NTP sync and timezone detection in parallel."""
+    return await asyncio.gather(
+        instances.time_sync.sync(),
+        instances.time_sync.detect_timezone()
+    )
+
 def setup_wifi():
     """Setup WiFi with AP fallback."""
     
     # WiFi manager handles everything: hostname, credentials, connection, mDNS
-    mode, mdns_server = instances.wifi.setup_and_connect()
+    mode, mdns_server = instances.wifi.setup_and_connect_sync()
     
     if mode == 'sta':
         print('WiFi connected successfully!')
@@ -22,20 +30,17 @@ def setup_wifi():
         # Set LED to normal state
         instances.led.set_state('normal')
         
-        # Sync time with NTP server
+        # Sync time with NTP and detect timezone concurrently - the two
+        # network exchanges are independent, so boot pays max() of their
+        # latencies instead of the sum
         print("=" * 50)
-        sync_success = instances.time_sync.sync()
+        sync_success, tz_info = asyncio.run(sync_time_and_timezone())
         
         # If sync failed, try to restore from config
         if not sync_success:
             print("Attempting to restore time from last known value...")
             instances.time_sync.restore_from_config()
         
-        print("=" * 50)
-        
-        # Detect timezone with exponential backoff retries
-        print("=" * 50)
-        tz_info = instances.time_sync.detect_timezone()
         if tz_info:
             # Save to config
             instances.config.set_timezone(
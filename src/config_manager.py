@@ -67,6 +67,21 @@ class ConfigManager:
         self.data['wifi']['ssid'] = ssid
         self.data['wifi']['password'] = password
     
+    def get_wifi_bssid_hint(self):
+        """Get the last-successful-AP hint, or None.
+        
+        Returns:
+            Dict with 'ssid' and 'bssid' (hex string), or None
+        """
+        return self.data.get('wifi_bssid_hint')
+    
+    def set_wifi_bssid_hint(self, hint):
+        """Save (or clear with None) the last-successful-AP hint."""
+        if hint is None:
+            self.data.pop('wifi_bssid_hint', None)
+        else:
+            self.data['wifi_bssid_hint'] = hint
+    
     # Hostname methods
     def get_hostname(self):
         return self.data.get('hostname', 'esp32')
@@ -136,6 +151,19 @@ class ConfigManager:
             "offset_seconds": offset_seconds
         }
     
+    def get_cached_timezone(self):
+        """Get the last successful timezone detection result, or None.
+
+        Returns:
+            Dict with 'ts' (unix timestamp of the detection) plus the
+            timezone fields, or None if never detected
+        """
+        return self.data.get('timezone_cache')
+
+    def set_cached_timezone(self, info):
+        """Save a timezone detection result (dict including 'ts')."""
+        self.data['timezone_cache'] = info
+
     # Time methods
     def get_last_known_time(self):
         """Get last known time (unix timestamp).
@@ -91,6 +91,9 @@ async def main():
     # Start Web Server (already initialized in instances)
     asyncio.create_task(instances.server.start())
     
+    # Start WiFi monitor (reconnects after AP drops in STA mode)
+    asyncio.create_task(instances.wifi.monitor())
+    
     # Start Automation Loop
     asyncio.create_task(automation_loop())
     
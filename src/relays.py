@@ -36,6 +36,15 @@ class RelayManager:
             self.relays = []
             
         self._setup_pins()
+        self._rebuild_label_index()
+
+    def _rebuild_label_index(self):
+        """Rebuild the label -> relay dict used by the lookup helpers.
+
+        Labels are unique in the UI, so a dict turns every by-label
+        operation into one hash lookup instead of a list scan per call.
+        """
+        self._by_label = {r.get('label'): r for r in self.relays}
 
     def save_config(self):
         """Save current configuration to JSON file (without runtime state)."""
@@ -117,6 +126,7 @@ class RelayManager:
                 
         self.save_config()
         self._setup_pins()  # Re-configure pins with new values
+        self._rebuild_label_index()
         return True
 
     def set_relay_by_label(self, label, state, keep_auto=False):
@@ -127,32 +137,28 @@ class RelayManager:
             state: New state (True/False)
             keep_auto: If True, keep current auto mode; if False, set to manual
         """
-        found = False
-        for relay in self.relays:
-            if relay.get('label') == label:
-                # Update value
-                relay['value'] = state
-                
-                # Update auto mode (default: set to manual when called from API)
-                if not keep_auto:
-                    relay['auto'] = False
-                
-                # Update physical pin
-                self.set_physical_state(
-                    relay['pin'], 
-                    relay['value'], 
-                    relay.get('isInverted', False)
-                )
-                found = True
-        
-        return found
+        relay = self._by_label.get(label)
+        if relay is None:
+            return False
+
+        # Update value
+        relay['value'] = state
+
+        # Update auto mode (default: set to manual when called from API)
+        if not keep_auto:
+            relay['auto'] = False
+
+        # Update physical pin
+        self.set_physical_state(
+            relay['pin'],
+            relay['value'],
+            relay.get('isInverted', False)
+        )
+        return True
 
     def get_relay_by_label(self, label):
         """Get a relay configuration by its label."""
-        for relay in self.relays:
-            if relay.get('label') == label:
-                return relay
-        return None
+        return self._by_label.get(label)
     
     def set_relay_error(self, label, error_message):
         """Set error message for a relay by its label.
@@ -161,11 +167,11 @@ class RelayManager:
             label: Relay label to find
             error_message: Error message string or None to clear
         """
-        for relay in self.relays:
-            if relay.get('label') == label:
-                relay['last_error'] = error_message
-                return True
-        return False
+        relay = self._by_label.get(label)
+        if relay is None:
+            return False
+        relay['last_error'] = error_message
+        return True
     
     def clear_relay_error(self, label):
         """Clear error message for a relay by its label.
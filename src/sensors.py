@@ -15,26 +15,39 @@ import time
 from machine import Pin, ADC
 from instances import instances
 
+# Sensor pin keys in the order _init_hardware unpacks them.
+# Must match the schema returned by ConfigManager.get_sensor_pins().
+_PIN_KEYS = ('i2c_scl', 'i2c_sda', 'ds18b20', 'photo_sensor', 'light_switch', 'reset_switch')
+
+# Minimum spacing between full update_all() passes (milliseconds).
+# Absorbs redundant calls when multiple tasks poll within a few ms.
+_UPDATE_DEBOUNCE_MS = 100
+
 class SensorManager:
     """Manages all sensor readings with caching and throttling."""
-    
-    def __init__(self):
+
+    def __init__(self, update_debounce_ms=_UPDATE_DEBOUNCE_MS):
         # Current sensor values
-        self.temperature = None  # Celsius
-        self.humidity = None     # Percentage
+        # Temperature/humidity are stored as ints scaled by 100 (22.15°C -> 2215)
+        # to avoid allocating a boxed float on every read cycle; getters and
+        # to_dict() convert back to float at the API boundary.
+        self._temp_x100 = None   # Celsius * 100
+        self._hum_x100 = None    # Percentage * 100
         self.light_level = None  # 0-4095 (ADC range), None if not configured
         self.switch_state = False
         self.reset_switch_state = False
-        
+
         # Last sensor values (for edge detection)
-        self.last_temperature = None
-        self.last_humidity = None
+        self._last_temp_x100 = None
+        self._last_hum_x100 = None
         self.last_light_level = None
         self.last_switch_state = False
         self.last_reset_switch_state = False
         self.last_time_seconds = 0  # For time-based edge detection
         
         # Timestamps for throttling
+        self.update_debounce_ms = update_debounce_ms
+        self._update_all_last = 0
         self.last_temp_humidity_read = 0
         self.last_light_read = 0
         self.last_switch_read = 0
@@ -44,6 +57,14 @@ class SensorManager:
         self.light_interval = 500           # 500ms for photo sensor
         self.switch_interval = 50           # 50ms for debouncing
         
+        # Last successful (temp_x100, hum_x100) pair; returned wholesale when
+        # a read fails so the error path reuses one tuple instead of
+        # clobbering good values and allocating fresh ones.
+        self._last_good_x100 = (None, None)
+
+        # Error counters per sensor (rate-limited logging)
+        self._err_counts = {'aht21': 0, 'ds18b20': 0, 'photo': 0, 'light_switch': 0, 'reset_switch': 0}
+
         # Hardware references
         self.aht21 = None
         self.ds18b20 = None
@@ -56,15 +77,10 @@ class SensorManager:
         
     def _init_hardware(self):
         """Initialize hardware sensors based on config.json sensor_pins."""
-        # Get sensor pins from config manager
+        # Get sensor pins from config manager, unpacked in _PIN_KEYS order
         sensor_pins = instances.config.get_sensor_pins()
-        
-        i2c_scl = sensor_pins.get('i2c_scl', -1)
-        i2c_sda = sensor_pins.get('i2c_sda', -1)
-        ds18b20_pin = sensor_pins.get('ds18b20', -1)
-        photo_sensor_pin = sensor_pins.get('photo_sensor', -1)
-        light_switch_pin = sensor_pins.get('light_switch', -1)
-        reset_switch_pin = sensor_pins.get('reset_switch', -1)
+        (i2c_scl, i2c_sda, ds18b20_pin, photo_sensor_pin,
+         light_switch_pin, reset_switch_pin) = (sensor_pins.get(k, -1) for k in _PIN_KEYS)
         
         # Initialize AHT21 (temperature/humidity sensor via I2C)
         if i2c_scl != -1 and i2c_sda != -1:
@@ -127,20 +143,43 @@ class SensorManager:
                 print(f"⚠ Failed to initialize reset switch: {e}")
                 self.reset_switch_pin = None
     
+    def _log_sensor_error(self, name, e):
+        """Log a sensor read error, rate-limited per sensor.
+
+        A failed sensor fails on every read cycle (e.g. I2C disconnect ->
+        error every 2s forever), so printing each error floods the UART.
+        Only print when the error count is a power of two, which bounds
+        log output to O(log n) for n consecutive failures.
+        """
+        count = self._err_counts[name] + 1
+        self._err_counts[name] = count
+        if count & (count - 1) == 0:
+            print(f"⚠ Error reading {name} (x{count}): {e}")
+
     def update_all(self):
-        """Update all sensors based on their intervals."""
+        """Update all sensors based on their intervals.
+
+        Calls arriving within update_debounce_ms of the previous pass are
+        coalesced into a no-op, so concurrent tasks can poll freely without
+        triggering back-to-back I2C transactions.
+        """
         current_time = time.ticks_ms()
-        
+
+        # Debounce: absorb redundant calls from concurrent tasks
+        if time.ticks_diff(current_time, self._update_all_last) < self.update_debounce_ms:
+            return
+        self._update_all_last = current_time
+
         # Update time (always, for edge detection)
         self.last_time_seconds = self.get_time_seconds()
         
         # Update temperature and humidity (AHT21 reads both at once)
         if time.ticks_diff(current_time, self.last_temp_humidity_read) >= self.temp_humidity_interval:
-            self.last_temperature = self.temperature
-            self.last_humidity = self.humidity
-            temp, humidity = self._read_temp_humidity()
-            self.temperature = temp
-            self.humidity = humidity
+            self._last_temp_x100 = self._temp_x100
+            self._last_hum_x100 = self._hum_x100
+            temp_x100, hum_x100 = self._read_temp_humidity()
+            self._temp_x100 = temp_x100
+            self._hum_x100 = hum_x100
             self.last_temp_humidity_read = current_time
         
         # Update light level (not implemented yet)
@@ -165,30 +204,37 @@ class SensorManager:
         2. DS18B20 (OneWire) - reads temp only, humidity stays None
         
         Returns:
-            Tuple of (temperature_celsius, humidity_percent)
+            Tuple of (temperature_x100, humidity_x100) as scaled ints
         """
-        temp = None
-        humidity = None
-        
+        temp_x100 = None
+        hum_x100 = None
+
         # Try AHT21 first (gives both temp and humidity)
         if self.aht21:
             try:
-                temp = self.aht21.T()       # Returns temperature in Celsius
-                humidity = self.aht21.RH()  # Returns relative humidity %
+                temp_x100 = int(self.aht21.T() * 100)   # Celsius * 100
+                hum_x100 = int(self.aht21.RH() * 100)   # Relative humidity % * 100
+                self._err_counts['aht21'] = 0
             except Exception as e:
-                print(f"⚠ Error reading AHT21: {e}")
-        
+                self._log_sensor_error('aht21', e)
+
         # If no temp yet, try DS18B20
-        if temp is None and self.ds18b20 and self.ds18b20_rom:
+        if temp_x100 is None and self.ds18b20 and self.ds18b20_rom:
             try:
                 self.ds18b20.convert_temp()
                 # DS18B20 needs ~750ms to convert, but we're called every 2s
                 # so previous conversion should be ready
-                temp = self.ds18b20.read_temp(self.ds18b20_rom)
+                temp_x100 = int(self.ds18b20.read_temp(self.ds18b20_rom) * 100)
+                self._err_counts['ds18b20'] = 0
             except Exception as e:
-                print(f"⚠ Error reading DS18B20: {e}")
-        
-        return (temp, humidity)
+                self._log_sensor_error('ds18b20', e)
+
+        if temp_x100 is None and hum_x100 is None:
+            # Both reads failed - hold the last good pair (no new allocation)
+            return self._last_good_x100
+
+        self._last_good_x100 = (temp_x100, hum_x100)
+        return self._last_good_x100
     
     def _read_light_level(self):
         """Read light level from analog photo sensor.
@@ -198,9 +244,11 @@ class SensorManager:
         """
         if self.photo_sensor_adc:
             try:
-                return self.photo_sensor_adc.read()
+                level = self.photo_sensor_adc.read()
+                self._err_counts['photo'] = 0
+                return level
             except Exception as e:
-                print(f"⚠ Error reading photo sensor: {e}")
+                self._log_sensor_error('photo', e)
                 return self.light_level  # Return last known value
         return None
     
@@ -212,9 +260,11 @@ class SensorManager:
         if self.light_switch_pin:
             try:
                 # Pin is pulled up, so 0 = pressed, 1 = not pressed
-                return self.light_switch_pin.value() == 0
+                state = self.light_switch_pin.value() == 0
+                self._err_counts['light_switch'] = 0
+                return state
             except Exception as e:
-                print(f"⚠ Error reading light switch: {e}")
+                self._log_sensor_error('light_switch', e)
                 return False
         return False
     
@@ -226,19 +276,21 @@ class SensorManager:
         if self.reset_switch_pin:
             try:
                 # Pin is pulled up, so 0 = pressed, 1 = not pressed
-                return self.reset_switch_pin.value() == 0
+                state = self.reset_switch_pin.value() == 0
+                self._err_counts['reset_switch'] = 0
+                return state
             except Exception as e:
-                print(f"⚠ Error reading reset switch: {e}")
+                self._log_sensor_error('reset_switch', e)
                 return False
         return False
     
     def get_temperature(self):
         """Get current temperature in Celsius (or None if not available)."""
-        return self.temperature
-    
+        return None if self._temp_x100 is None else self._temp_x100 / 100
+
     def get_humidity(self):
         """Get current humidity percentage (or None if not available)."""
-        return self.humidity
+        return None if self._hum_x100 is None else self._hum_x100 / 100
     
     def get_light_level(self):
         """Get current light level (0-4095)."""
@@ -254,11 +306,11 @@ class SensorManager:
     
     def get_last_temperature(self):
         """Get previous temperature reading."""
-        return self.last_temperature
-    
+        return None if self._last_temp_x100 is None else self._last_temp_x100 / 100
+
     def get_last_humidity(self):
         """Get previous humidity reading."""
-        return self.last_humidity
+        return None if self._last_hum_x100 is None else self._last_hum_x100 / 100
     
     def get_last_light_level(self):
         """Get previous light level reading."""
@@ -296,8 +348,8 @@ class SensorManager:
     def to_dict(self):
         """Return all sensor values as a dictionary (for API)."""
         return {
-            "temperature": self.temperature,
-            "humidity": self.humidity,
+            "temperature": self.get_temperature(),
+            "humidity": self.get_humidity(),
             "light_level": self.light_level,
             "switch_state": self.switch_state,
             "reset_switch_state": self.reset_switch_state,
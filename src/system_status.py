@@ -1,206 +1,314 @@
-import os
 import gc
 import time
 import machine
+import micropython
 import network
-import esp32
 import sys
 from instances import instances
 
+# os and esp32 are imported lazily: os only backs the (30s-cached) flash
+# stats and esp32 only the chip temperature, so keeping them out of the
+# module prologue trims baseline heap on boots that never hit those paths
+
+@micropython.native
+def _fmt_uptime(secs):
+    """Format a second count as 'Xh Ym Zs' (pure int math, native-compiled)."""
+    h = secs // 3600
+    m = (secs % 3600) // 60
+    s = secs % 60
+    return "{}h {}m {}s".format(h, m, s)
+
+# Nibble-to-hex lookup for MAC formatting
+_HEX = b"0123456789ABCDEF"
+
+# Reset-cause names, built once at import instead of per _get_boot_reason call.
+# A tuple of pairs: with 5 entries a linear scan beats dict hashing on
+# MicroPython and keeps the table immutable.
+try:
+    _RESET_REASONS = (
+        (machine.PWRON_RESET, "Power on"),
+        (machine.HARD_RESET, "Hard reset"),
+        (machine.WDT_RESET, "Watchdog"),
+        (machine.DEEPSLEEP_RESET, "Deep sleep"),
+        (machine.SOFT_RESET, "Software reset")
+    )
+except AttributeError:
+    _RESET_REASONS = ()
+
 class SystemStatus:
     """Collects and formats system status information."""
     
     def __init__(self, start_time):
         """Initialize system status.
-        
+
         Args:
             start_time: System start time in milliseconds (from time.ticks_ms())
         """
         self.start_time = start_time
+
+        # Cached os.statvfs result (SPIFFS/LittleFS statvfs can take seconds
+        # under load, so don't re-issue it on every status poll)
+        self._flash_cache = None
+        self._flash_cache_ts = 0
+
+        # Reuse one WLAN handle instead of allocating a wrapper per call
+        self._wlan = network.WLAN(network.STA_IF)
+
+        # MAC address and hostname never change after boot - format once,
+        # writing hex nibbles into one 17-byte buffer instead of joining
+        # six per-byte format() strings
+        try:
+            mac = self._wlan.config('mac')
+            buf = bytearray(17)
+            for i in range(6):
+                j = i * 3
+                b = mac[i]
+                buf[j] = _HEX[b >> 4]
+                buf[j + 1] = _HEX[b & 0x0F]
+                if i < 5:
+                    buf[j + 2] = 0x3A  # ':'
+            self._mac = bytes(buf).decode()
+        except (OSError, ValueError):
+            self._mac = "Unknown"
+        self._hostname = f"{instances.config.get_hostname()}.local"
+
+        # Connection-dependent info (IP/SSID/RSSI) cached with a short TTL
+        # to coalesce rapid status polls
+        self._conn_cache = None
+        self._conn_cache_ts = 0
+
+        # Chip temperature cached with its own (longer) TTL - it is a slow
+        # syscall-like read that barely changes between seconds
+        self._temp_cache = None
+        self._temp_cache_ts = 0
+        self._esp32 = None  # Module ref, imported on first temperature read
+
+        # CPU frequency only changes on an explicit machine.freq(n) call,
+        # which this firmware never makes - format it once
+        self._cpu_freq_str = f"{machine.freq() // 1_000_000} MHz"
+
+        # Full status snapshot, rebuilt at most once per MIN_STATUS_INTERVAL_MS;
+        # cheap live fields (uptime, free memory) are overlaid on fast polls
+        self._status_cache = None
+        self._status_cache_ts = 0
+
+        # Board/chip/version fields never change after boot - build the
+        # head of the status list once instead of re-formatting per call
+        board_name = instances.board.get_name()
+        self._static_head = [
+            {'key': 'Board', 'value': board_name},
+            {'key': 'Chip', 'value': instances.board.get_chip()},
+        ]
+        if board_name == "Unconfigured Board":
+            self._static_head.append(
+                {'key': '⚠️ WARNING', 'value': "Board not configured! Set board in config.json"})
+        self._static_head.append({'key': 'MicroPython', 'value': self._get_micropython_version()})
     
+    # Minimum spacing between full status rebuilds (milliseconds)
+    MIN_STATUS_INTERVAL_MS = 1000
+
     def get_status(self):
         """
         Get comprehensive system status as an ordered list.
         Returns a list of {"key": "...", "value": "..."} objects to guarantee order.
+
+        A full rebuild (statvfs, WLAN queries, chip temperature, ...) runs at
+        most once per MIN_STATUS_INTERVAL_MS; polls in between get the cached
+        snapshot with uptime and free memory refreshed in place.
         """
-        status_items = []
-        
-        # Board info
-        board_name = instances.board.get_name()
-        status_items.append({'key': 'Board', 'value': board_name})
-        status_items.append({'key': 'Chip', 'value': instances.board.get_chip()})
-        
-        # Warn if board is unconfigured
-        if board_name == "Unconfigured Board":
-            status_items.append({'key': '⚠️ WARNING', 'value': "Board not configured! Set board in config.json"})
-        
-        status_items.append({'key': 'MicroPython', 'value': self._get_micropython_version()})
-        
-        # Time info (if available)
-        time_info = self._get_time_info()
-        for key, value in time_info:
-            status_items.append({'key': key, 'value': value})
-        
-        # Network info
-        network_info = self._get_network_info()
-        for key, value in network_info:
-            status_items.append({'key': key, 'value': value})
-        
-        # CPU info
-        status_items.append({'key': 'CPU Frequency', 'value': f"{machine.freq() // 1_000_000} MHz"})
-        status_items.append({'key': 'Chip Temperature', 'value': self._get_chip_temperature()})
-        
-        # Uptime
-        status_items.append({'key': 'Uptime', 'value': self._get_uptime()})
-        status_items.append({'key': 'Last Boot', 'value': self._get_boot_reason()})
-        
-        # Memory info
-        memory_info = self._get_memory_info()
-        for key, value in memory_info:
-            status_items.append({'key': key, 'value': value})
-        
-        # Flash storage info
-        flash_info = self._get_flash_info()
-        for key, value in flash_info:
-            status_items.append({'key': key, 'value': value})
-        
-        # GC info
-        status_items.append({'key': 'GC Collections', 'value': str(gc.mem_alloc())})
-        
+        now = time.ticks_ms()
+        if (self._status_cache is not None and
+                time.ticks_diff(now, self._status_cache_ts) < self.MIN_STATUS_INTERVAL_MS):
+            self._overlay_live_items(self._status_cache)
+            return self._status_cache
+
+        # Sample the gc counters once; reused by memory rows and the GC row
+        mem_free = gc.mem_free()
+        mem_alloc = gc.mem_alloc()
+
+        # Helpers return tuples, so one concatenation yields a known-length
+        # sequence and the list comp below allocates in a single pass
+        # instead of ~12 incremental append/grow steps
+        rows = (
+            self._get_time_info()
+            + self._get_network_info()
+            + (
+                ('CPU Frequency', self._cpu_freq_str),
+                ('Chip Temperature', self._get_chip_temperature()),
+                ('Uptime', self._get_uptime()),
+                ('Last Boot', self._get_boot_reason()),
+            )
+            + self._get_memory_info(mem_free, mem_alloc)
+            + self._get_flash_info()
+            + (('GC Collections', str(mem_alloc)),)
+        )
+        status_items = self._static_head + [{'key': k, 'value': v} for k, v in rows]
+
+        self._status_cache = status_items
+        self._status_cache_ts = now
         return status_items
-    
+
+    def _overlay_live_items(self, status_items):
+        """Refresh the cheap, fast-changing fields of a cached snapshot."""
+        for item in status_items:
+            key = item['key']
+            if key == 'Uptime':
+                item['value'] = self._get_uptime()
+            elif key == 'Free Memory':
+                item['value'] = f"{gc.mem_free():,} bytes"
+
     def _get_micropython_version(self):
-        """Get MicroPython version string."""
-        try:
-            return sys.version.split()[0]
-        except:
-            return "Unknown"
+        """Get MicroPython version string (called once at init)."""
+        return sys.version.split()[0]
     
     def _get_time_info(self):
-        """Get time synchronization information as list of tuples."""
-        info = []
-        info.append(('Current Time', instances.time_sync.get_time_string()))
-        info.append(('Current Date', instances.time_sync.get_date_string()))
-        info.append(('Timezone', instances.time_sync.get_timeone_string()))
-        return info
+        """Get time synchronization information as a tuple of pairs."""
+        return (
+            ('Current Time', instances.time_sync.get_time_string()),
+            ('Current Date', instances.time_sync.get_date_string()),
+            ('Timezone', instances.time_sync.get_timeone_string()),
+        )
     
+    # How long cached IP/SSID/RSSI values stay fresh (milliseconds)
+    CONN_CACHE_TTL_MS = 2000
+
     def _get_network_info(self):
-        """Get WiFi network information as list of tuples."""
-        info = []
-        wlan = network.WLAN(network.STA_IF)
-        
-        # MAC address (always available)
-        try:
-            mac = ':'.join(['{:02X}'.format(b) for b in wlan.config('mac')])
-            info.append(('MAC Address', mac))
-        except:
-            info.append(('MAC Address', "Unknown"))
-        
-        # Hostname
-        hostname = instances.config.get_hostname()
-        info.append(('Hostname', f"{hostname}.local"))
-        
-        # Connection-dependent info
+        """Get WiFi network information as a tuple of pairs.
+
+        MAC and hostname are formatted once at init; connection-dependent
+        fields are cached for CONN_CACHE_TTL_MS to avoid hammering
+        wlan.config()/status() on rapid polls.
+        """
+        head = (('MAC Address', self._mac), ('Hostname', self._hostname))
+        wlan = self._wlan
+
+        now = time.ticks_ms()
+        if (self._conn_cache is not None and
+                time.ticks_diff(now, self._conn_cache_ts) < self.CONN_CACHE_TTL_MS):
+            return head + self._conn_cache
+
+        conn = []
         if wlan.isconnected():
             try:
-                ifconfig = wlan.ifconfig()
-                info.append(('IP Address', ifconfig[0]))
-            except:
-                info.append(('IP Address', "Error"))
-            
+                conn.append(('IP Address', wlan.ifconfig()[0]))
+            except OSError:
+                conn.append(('IP Address', "Error"))
+
             try:
-                info.append(('WiFi SSID', wlan.config('essid')))
-            except:
-                info.append(('WiFi SSID', "Unknown"))
-            
+                conn.append(('WiFi SSID', wlan.config('essid')))
+            except OSError:
+                conn.append(('WiFi SSID', "Unknown"))
+
             try:
                 rssi = wlan.status('rssi')
-                info.append(('WiFi Signal', f"{rssi} dBm"))
-            except:
+                conn.append(('WiFi Signal', f"{rssi} dBm"))
+            except OSError:
                 pass  # Don't add signal if unavailable
         else:
-            info.append(('IP Address', "Not connected"))
-            info.append(('WiFi SSID', "Not connected"))
-        
-        return info
+            conn.append(('IP Address', "Not connected"))
+            conn.append(('WiFi SSID', "Not connected"))
+
+        self._conn_cache = tuple(conn)
+        self._conn_cache_ts = now
+        return head + self._conn_cache
     
+    # How long a chip temperature reading stays fresh (milliseconds)
+    TEMP_CACHE_TTL_MS = 4000
+
     def _get_chip_temperature(self):
-        """Get internal chip temperature."""
+        """Get internal chip temperature (cached for TEMP_CACHE_TTL_MS)."""
+        now = time.ticks_ms()
+        if (self._temp_cache is not None and
+                time.ticks_diff(now, self._temp_cache_ts) < self.TEMP_CACHE_TTL_MS):
+            return self._temp_cache
         try:
+            if self._esp32 is None:
+                import esp32
+                self._esp32 = esp32
             # ESP32 raw_temperature returns Fahrenheit
-            temp_f = esp32.raw_temperature()
+            temp_f = self._esp32.raw_temperature()
             temp_c = (temp_f - 32) * 5 / 9
-            return f"{temp_c:.1f}°C ({temp_f:.1f}°F)"
-        except:
-            return "N/A"
+            self._temp_cache = f"{temp_c:.1f}°C ({temp_f:.1f}°F)"
+        except (ImportError, AttributeError, OSError):
+            self._temp_cache = "N/A"
+        self._temp_cache_ts = now
+        return self._temp_cache
     
     def _get_uptime(self):
         """Get formatted uptime string."""
         try:
             uptime_s = time.ticks_diff(time.ticks_ms(), self.start_time) // 1000
-            uptime_h = uptime_s // 3600
-            uptime_m = (uptime_s % 3600) // 60
-            uptime_s_remaining = uptime_s % 60
-            return f"{uptime_h}h {uptime_m}m {uptime_s_remaining}s"
-        except:
+            return _fmt_uptime(uptime_s)
+        except (ValueError, OverflowError):
             return "Unknown"
     
     def _get_boot_reason(self):
         """Get the reason for last boot/reset."""
         try:
             reset_cause = machine.reset_cause()
-            reset_reasons = {
-                machine.PWRON_RESET: "Power on",
-                machine.HARD_RESET: "Hard reset",
-                machine.WDT_RESET: "Watchdog",
-                machine.DEEPSLEEP_RESET: "Deep sleep",
-                machine.SOFT_RESET: "Software reset"
-            }
-            return reset_reasons.get(reset_cause, f"Unknown ({reset_cause})")
-        except:
+            for code, name in _RESET_REASONS:
+                if code == reset_cause:
+                    return name
+            return f"Unknown ({reset_cause})"
+        except AttributeError:
             return "Unknown"
     
-    def _get_memory_info(self):
-        """Get memory usage information as list of tuples."""
-        info = []
+    def _get_memory_info(self, mem_free, mem_alloc):
+        """Get memory usage information as a tuple of pairs.
+
+        Args:
+            mem_free: Result of gc.mem_free(), sampled once by the caller
+            mem_alloc: Result of gc.mem_alloc(), from the same sample
+        """
         try:
-            mem_free = gc.mem_free()
-            mem_alloc = gc.mem_alloc()
             mem_total = mem_free + mem_alloc
-            
-            info.append(('Free Memory', f"{mem_free:,} bytes"))
-            info.append(('Total Memory', f"{mem_total:,} bytes"))
-            info.append(('Memory Usage', f"{(mem_alloc / mem_total * 100):.1f}%"))
-        except:
-            info.append(('Free Memory', "Unknown"))
-            info.append(('Total Memory', "Unknown"))
-            info.append(('Memory Usage', "Unknown"))
-        
-        return info
+            return (
+                ('Free Memory', f"{mem_free:,} bytes"),
+                ('Total Memory', f"{mem_total:,} bytes"),
+                ('Memory Usage', f"{(mem_alloc / mem_total * 100):.1f}%"),
+            )
+        except MemoryError:
+            return (
+                ('Free Memory', "Unknown"),
+                ('Total Memory', "Unknown"),
+                ('Memory Usage', "Unknown"),
+            )
     
+    # How long a statvfs result stays fresh (milliseconds)
+    FLASH_CACHE_TTL_MS = 30_000
+
     def _get_flash_info(self):
-        """Get flash storage information as list of tuples."""
-        info = []
+        """Get flash storage information as a tuple of pairs.
+
+        The statvfs result is cached for FLASH_CACHE_TTL_MS since the
+        filesystem stat is by far the slowest call in get_status().
+        """
         try:
-            stat = os.statvfs('/')
-            block_size = stat[0]
-            total_blocks = stat[2]
-            free_blocks = stat[3]
-            
+            now = time.ticks_ms()
+            if (self._flash_cache is None or
+                    time.ticks_diff(now, self._flash_cache_ts) >= self.FLASH_CACHE_TTL_MS):
+                import os
+                stat = os.statvfs('/')
+                self._flash_cache = (stat[0], stat[2], stat[3])
+                self._flash_cache_ts = now
+            block_size, total_blocks, free_blocks = self._flash_cache
+
             flash_total = (total_blocks * block_size) // 1024  # KB
             flash_free = (free_blocks * block_size) // 1024
             flash_used = flash_total - flash_free
             flash_usage_pct = (flash_used / flash_total * 100) if flash_total > 0 else 0
-            
-            info.append(('Flash Total', f"{flash_total:,} KB"))
-            info.append(('Flash Used', f"{flash_used:,} KB"))
-            info.append(('Flash Free', f"{flash_free:,} KB"))
-            info.append(('Flash Usage', f"{flash_usage_pct:.1f}%"))
-        except:
-            info.append(('Flash Total', "Unknown"))
-            info.append(('Flash Used', "Unknown"))
-            info.append(('Flash Free', "Unknown"))
-            info.append(('Flash Usage', "Unknown"))
-        
-        return info
+
+            return (
+                ('Flash Total', f"{flash_total:,} KB"),
+                ('Flash Used', f"{flash_used:,} KB"),
+                ('Flash Free', f"{flash_free:,} KB"),
+                ('Flash Usage', f"{flash_usage_pct:.1f}%"),
+            )
+        except OSError:
+            return (
+                ('Flash Total', "Unknown"),
+                ('Flash Used', "Unknown"),
+                ('Flash Free', "Unknown"),
+                ('Flash Usage', "Unknown"),
+            )
 
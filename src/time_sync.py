@@ -1,22 +1,34 @@
 # time_sync.py - NTP time synchronization for MicroPython
 
-import ntptime
 import time
+import micropython
+import uasyncio as asyncio
 from machine import RTC
-import urequests
-import ujson
 from instances import instances
 
+# socket is imported lazily (sync / _fetch_timezone_fields) so boots
+# that never reach the network keep it off the heap
+
+# NTP servers to try (in order); tuple keeps the table immutable and off
+# the mutable-object heap path
+_NTP_SERVERS = (
+    "pool.ntp.org",
+    "time.nist.gov",
+    "time.windows.com"
+)
+
+# Zero-padded strings for 0-99: indexing this table replaces "{:02d}"
+# formatting (and its temporary allocations) in every time/date string
+_TWO_DIGIT = tuple("{:02d}".format(i) for i in range(100))
+
+@micropython.native
+def _fmt_hms(hour, minute, second):
+    """Format H:M:S as 'HH:MM:SS' (table lookups, native-compiled)."""
+    return _TWO_DIGIT[hour] + ":" + _TWO_DIGIT[minute] + ":" + _TWO_DIGIT[second]
+
 class TimeSync:
     """Manages NTP time synchronization."""
     
-    # NTP servers to try (in order)
-    NTP_SERVERS = [
-        "pool.ntp.org",
-        "time.nist.gov",
-        "time.windows.com"
-    ]
-    
     # Default timezone offset in seconds (UTC)
     # Can be overridden via set_timezone()
     TIMEZONE_OFFSET = 0
@@ -25,6 +37,38 @@ class TimeSync:
         self.rtc = RTC()
         self.last_sync_time = 0
         self.is_synced = False
+
+        # Memoized localtime tuple keyed on the local-seconds value, so all
+        # queries within the same second (e.g. a status build formatting
+        # time, date, and timezone) share one localtime() conversion
+        self._cached_sec = -1
+        self._cached_tuple = None
+
+        # Last rendered datetime string and the second it was built for
+        self._cached_dt_sec = -1
+        self._cached_dt_str = None
+
+        # Resolved NTP server IPs (server -> (ip, unix_ts)) and the last
+        # server that answered, so re-syncs skip DNS and dead servers
+        self._resolved = {}
+        self._last_good_server = None
+
+        # Timezone name from config, cached until set_timezone changes it
+        self._tz_name_cache = None
+
+        # Every in-tree caller uses the default 24-hour format; binding
+        # the specialized formatter on the instance skips the mode branch
+        # (and the default-argument handling) on each status poll
+        self.get_time_string = self._get_time_string_24
+
+        # Measured RTC drift in parts-per-million, smoothed across syncs.
+        # The ESP32 RTC can drift by minutes per day; correcting between
+        # syncs keeps schedules accurate without extra NTP traffic
+        self._drift_ppm = 0.0
+
+        # Backoff carried across sync() calls: grows while NTP stays
+        # unreachable, resets to RETRY_DELAY_S on success
+        self._retry_delay = self.RETRY_DELAY_S
     
     def set_timezone(self, offset_hours):
         """Set timezone offset in hours from UTC.
@@ -35,17 +79,30 @@ class TimeSync:
             set_timezone(1)   # CET (UTC+1)
         """
         self.TIMEZONE_OFFSET = offset_hours * 3600
+        self._tz_name_cache = None
+        self._invalidate_time_cache()
     
-    def detect_timezone(self, max_retries=3, initial_delay=0.5):
+    # How long a persisted timezone detection stays fresh (seconds)
+    TZ_CACHE_TTL_S = 30 * 86400
+
+    async def detect_timezone(self, max_retries=3, initial_delay=0.5):
         """Detect timezone automatically using IP geolocation with exponential backoff.
-        
+
         Uses WorldTimeAPI.org to determine timezone based on IP address.
-        Retries with exponential backoff: 0.5s, 1s, 2s (total ~3.5s)
-        
+        Retries with exponential backoff: 0.5s, 1s, 2s (total ~3.5s).
+        Fully async, so boot can overlap it with the NTP sync via
+        asyncio.gather instead of paying both round-trips back to back.
+
+        A successful result is persisted in config and reused for
+        TZ_CACHE_TTL_S, so warm boots skip the 1-10s network round-trip
+        entirely. If every retry fails but a stale cached result exists,
+        that is returned (with "stale": True) instead of None - an old
+        timezone beats no timezone for the scheduler.
+
         Args:
             max_retries: Maximum number of retry attempts (default 3)
             initial_delay: Initial delay in seconds (default 0.5)
-        
+
         Returns:
             Dict with timezone info on success, None on failure:
             {
@@ -54,82 +111,162 @@ class TimeSync:
                 "utc_offset_hours": -8.0
             }
         """
-        if urequests is None or ujson is None:
-            print("⚠ urequests/ujson not available, cannot detect timezone")
-            return None
-        
+        # Serve a recent cached detection without touching the network
+        cached = instances.config.get_cached_timezone()
+        if cached and time.time() - cached.get('ts', 0) < self.TZ_CACHE_TTL_S:
+            print(f"Using cached timezone: {cached['timezone']}")
+            return cached
+
         delay = initial_delay
-        
+
         for attempt in range(max_retries):
             try:
                 if attempt == 0:
                     print("Detecting timezone via WorldTimeAPI.org...")
                 else:
                     print(f"Retry {attempt}/{max_retries-1} after {delay}s delay...")
-                    time.sleep(delay)
-                
-                response = urequests.get("http://worldtimeapi.org/api/ip", timeout=10)
-                
-                if response.status_code == 200:
-                    data = ujson.loads(response.text)
-                    response.close()
-                    
-                    timezone_name = data.get("timezone", "Unknown")
-                    utc_offset_str = data.get("utc_offset", "+00:00")  # Format: "+08:00" or "-05:00"
-                    
+                    await asyncio.sleep(delay)
+
+                timezone_name, utc_offset_str = await asyncio.wait_for(
+                    self._fetch_timezone_fields(), 10)
+
+                if timezone_name and utc_offset_str and len(utc_offset_str) == 6:
                     # Parse UTC offset (format: +HH:MM or -HH:MM)
                     sign = 1 if utc_offset_str[0] == '+' else -1
                     hours = int(utc_offset_str[1:3])
                     minutes = int(utc_offset_str[4:6])
                     utc_offset_seconds = sign * (hours * 3600 + minutes * 60)
                     utc_offset_hours = utc_offset_seconds / 3600
-                    
+
                     result = {
                         "timezone": timezone_name,
                         "utc_offset_seconds": utc_offset_seconds,
                         "utc_offset_hours": utc_offset_hours
                     }
-                    
+
                     print(f"✓ Detected timezone: {timezone_name} (UTC{utc_offset_hours:+.1f})")
+                    result['ts'] = time.time()
+                    instances.config.set_cached_timezone(result)
+                    instances.config.save_config()
                     return result
                 else:
-                    print(f"⚠ WorldTimeAPI returned status {response.status_code}")
-                    response.close()
-                    
+                    print("⚠ WorldTimeAPI response missing timezone fields")
+
             except Exception as e:
                 print(f"⚠ Attempt {attempt + 1} failed: {e}")
-            
+
             # Exponential backoff for next retry
             delay *= 2
-        
+
+        if cached:
+            print("⚠ Detection failed, using stale cached timezone")
+            cached['stale'] = True
+            return cached
         print("⚠ Failed to detect timezone after all retries")
         return None
-    
-    
-    def sync(self, retry_count=3, save_to_config=True):
+
+    async def _fetch_timezone_fields(self):
+        """Fetch the timezone name and UTC offset via an async GET.
+
+        Reads the WorldTimeAPI response in small chunks and scans for just
+        the two JSON fields needed. This avoids urequests' Response object
+        and a full ujson.loads dict, which together caused a peak-RAM
+        allocation burst during the network window. Awaiting the socket
+        lets the NTP sync (and anything else scheduled) run in parallel;
+        the caller bounds the whole exchange with asyncio.wait_for.
+
+        Returns:
+            Tuple of (timezone_name, utc_offset_str); either may be None
+        """
+        buf = b''
+        tz_name = None
+        utc_offset = None
+        writer = None
+        try:
+            reader, writer = await asyncio.open_connection("worldtimeapi.org", 80)
+            writer.write(b"GET /api/ip HTTP/1.0\r\nHost: worldtimeapi.org\r\n\r\n")
+            await writer.drain()
+            while tz_name is None or utc_offset is None:
+                chunk = await reader.read(256)
+                if not chunk:
+                    break
+                buf += chunk
+                if tz_name is None:
+                    tz_name = self._extract_json_field(buf, b'"timezone":"')
+                if utc_offset is None:
+                    utc_offset = self._extract_json_field(buf, b'"utc_offset":"')
+                if len(buf) > 2048:
+                    break  # Bound buffering on unexpected responses
+        finally:
+            if writer is not None:
+                writer.close()
+                await writer.wait_closed()
+        return (tz_name, utc_offset)
+
+    @staticmethod
+    def _extract_json_field(buf, marker):
+        """Extract a quoted JSON string value following marker, or None."""
+        start = buf.find(marker)
+        if start == -1:
+            return None
+        start += len(marker)
+        end = buf.find(b'"', start)
+        if end == -1:
+            return None  # Value not fully received yet
+        return buf[start:end].decode()
+
+
+    # Exponential backoff bounds between failed sync rounds (seconds)
+    RETRY_DELAY_S = 5
+    RETRY_DELAY_MAX_S = 600
+
+    async def sync(self, retry_count=3, save_to_config=True):
         """Synchronize time with NTP server.
-        
+
+        Round-robins across all servers each attempt, so one unreachable
+        server costs a single timeout per round instead of blocking its
+        retries ahead of the others. Failed rounds back off exponentially
+        (5s, 10s, ... capped at RETRY_DELAY_MAX_S) with +/-20% jitter so a
+        fleet of boards doesn't re-hit the pool in lockstep; the delay
+        carries across sync() calls and resets on success. Sleeps yield to
+        other tasks; boot-time callers run it via asyncio.run().
+
         Args:
-            retry_count: Number of times to retry on failure
+            retry_count: Number of rounds across all servers
             save_to_config: If True, save timestamp to config for fallback
-            
+
         Returns:
             True if sync successful, False otherwise
         """
-        for server in self.NTP_SERVERS:
-            for attempt in range(retry_count):
+        # Precompute attempt labels so the inner loop doesn't rebuild them
+        attempt_labels = tuple(f"{i + 1}/{retry_count}" for i in range(retry_count))
+
+        # Try the last server that answered first - its IP is cached, so
+        # the happy path costs one UDP round-trip and no DNS
+        servers = _NTP_SERVERS
+        if self._last_good_server in servers and servers[0] != self._last_good_server:
+            servers = ((self._last_good_server,)
+                       + tuple(x for x in servers if x != self._last_good_server))
+
+        for attempt in range(retry_count):
+            for server in servers:
                 try:
-                    print(f"Syncing time with {server} (attempt {attempt + 1}/{retry_count})...")
-                    
-                    # Set NTP host
-                    ntptime.host = server
-                    
-                    # Sync time (sets system time to UTC)
-                    ntptime.settime()
-                    
+                    print(f"Syncing time with {server} (attempt {attempt_labels[attempt]})...")
+
+                    # Query the server directly and set the RTC to UTC
+                    local_before = time.time()
+                    t = self._ntp_query(self._resolve(server))
+                    self._update_drift(local_before, t)
+                    tm = time.gmtime(t)
+                    self.rtc.datetime((tm[0], tm[1], tm[2], tm[6] + 1,
+                                       tm[3], tm[4], tm[5], 0))
+                    self._last_good_server = server
+                    self._retry_delay = self.RETRY_DELAY_S
+
                     # Mark as synced
                     self.is_synced = True
                     self.last_sync_time = time.time()
+                    self._invalidate_time_cache()
                     
                     # Save to config for fallback
                     if save_to_config:
@@ -137,8 +274,9 @@ class TimeSync:
                         instances.config.save_config()
                     
                     # Get current time
-                    current_time = time.localtime()
-                    time_str = f"{current_time[0]}-{current_time[1]:02d}-{current_time[2]:02d} {current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}"
+                    t = time.localtime()
+                    time_str = (str(t[0]) + "-" + _TWO_DIGIT[t[1]] + "-" + _TWO_DIGIT[t[2]]
+                                + " " + _fmt_hms(t[3], t[4], t[5]))
                     
                     print(f"✓ Time synced successfully: {time_str} UTC")
                     if self.TIMEZONE_OFFSET != 0:
@@ -146,88 +284,213 @@ class TimeSync:
                         print(f"  Timezone offset: UTC{offset_hours:+d}")
                     
                     return True
-                    
-                except Exception as e:
+
+                except OSError as e:
+                    # DNS failure or UDP timeout - drop the cached IP so
+                    # the next round re-resolves
                     print(f"  Failed to sync with {server}: {e}")
-                    if attempt < retry_count - 1:
-                        time.sleep(1)  # Wait before retry
+                    self._resolved.pop(server, None)
                     continue
-        
+
+            # Whole round failed - back off with jitter before the next
+            if attempt < retry_count - 1:
+                import random
+                await asyncio.sleep(self._retry_delay * (0.8 + 0.4 * random.random()))
+                self._retry_delay = min(self._retry_delay * 2, self.RETRY_DELAY_MAX_S)
+
         print("⚠ Failed to sync time with any NTP server")
         return False
+
+    # How long a resolved NTP server IP stays fresh (seconds)
+    DNS_TTL_S = 3600
+
+    def _resolve(self, server):
+        """Resolve an NTP server name, caching the IP for DNS_TTL_S."""
+        import socket
+        cached = self._resolved.get(server)
+        if cached and time.time() - cached[1] < self.DNS_TTL_S:
+            return cached[0]
+        ip = socket.getaddrinfo(server, 123)[0][-1][0]
+        self._resolved[server] = (ip, time.time())
+        return ip
+
+    @staticmethod
+    def _ntp_query(ip, timeout=2):
+        """Send one NTP request datagram and return UTC epoch seconds.
+
+        A single 48-byte UDP exchange replaces ntptime's blocking
+        DNS-per-call path; the transmit timestamp is read from offset 40.
+        """
+        import socket
+        # NTP epoch is 1900; convert to this port's time.time() epoch
+        ntp_delta = 3155673600 if time.gmtime(0)[0] == 2000 else 2208988800
+        pkt = bytearray(48)
+        pkt[0] = 0x1B  # LI=0, VN=3, Mode=3 (client)
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(timeout)
+        try:
+            s.sendto(pkt, (ip, 123))
+            msg = s.recv(48)
+        finally:
+            s.close()
+        if len(msg) < 44:
+            raise OSError("short NTP response")
+        val = (msg[40] << 24) | (msg[41] << 16) | (msg[42] << 8) | msg[43]
+        return val - ntp_delta
     
+    # Ignore drift samples from intervals too short to measure reliably,
+    # and discard implausible rates (honest RTCs stay well under 0.5%)
+    DRIFT_MIN_INTERVAL_S = 600
+    DRIFT_MAX_PPM = 5000
+
+    def _update_drift(self, local_before, ntp_now):
+        """Fold one (local clock, NTP clock) sample into the drift estimate.
+
+        Called on sync success with the local epoch read just before the
+        NTP query. The per-interval error rate is smoothed with an
+        exponential moving average so a single noisy round-trip doesn't
+        swing the correction.
+        """
+        interval = ntp_now - self.last_sync_time
+        if not self.is_synced or interval < self.DRIFT_MIN_INTERVAL_S:
+            return
+        new_ppm = (ntp_now - local_before) * 1_000_000 / interval
+        if -self.DRIFT_MAX_PPM < new_ppm < self.DRIFT_MAX_PPM:
+            self._drift_ppm = 0.7 * self._drift_ppm + 0.3 * new_ppm
+
     def get_time_tuple(self):
         """Get current time as tuple (year, month, day, hour, minute, second, weekday, yearday).
-        
-        Applies timezone offset if set.
+
+        Applies timezone offset if set, plus the measured RTC drift
+        accumulated since the last NTP sync. The result is memoized per
+        local second, so repeated same-second queries reuse one
+        localtime() conversion and its tuple allocation.
         """
-        # Get UTC time
-        utc_seconds = time.time()
-        
-        # Apply timezone offset
-        local_seconds = utc_seconds + self.TIMEZONE_OFFSET
-        
+        # Get UTC time and apply timezone offset and drift correction
+        now = time.time()
+        local_seconds = now + self.TIMEZONE_OFFSET
+        if self._drift_ppm and self.is_synced:
+            local_seconds += int((now - self.last_sync_time) * self._drift_ppm / 1_000_000)
+
+        if local_seconds == self._cached_sec:
+            return self._cached_tuple
+
         # Convert to time tuple
-        return time.localtime(local_seconds)
+        self._cached_tuple = time.localtime(local_seconds)
+        self._cached_sec = local_seconds
+        return self._cached_tuple
+
+    def _invalidate_time_cache(self):
+        """Drop the memoized time values after a clock or timezone change."""
+        self._cached_sec = -1
+        self._cached_dt_sec = -1
     
+    def snapshot(self):
+        """Get (hour, minute, second, minute_of_day) from one time read.
+
+        Callers that consume several fields (automation rules, status
+        rendering) should prefer this over the single-field getters so
+        they pay the localtime conversion once.
+        """
+        t = self.get_time_tuple()
+        hour = t[3]
+        minute = t[4]
+        return (hour, minute, t[5], hour * 60 + minute)
+
+    # Single-field accessors kept as thin wrappers for existing rules;
+    # prefer snapshot() when reading more than one field
     def get_hour(self):
         """Get current hour (0-23) in local timezone."""
         return self.get_time_tuple()[3]
-    
+
     def get_minute(self):
         """Get current minute (0-59)."""
         return self.get_time_tuple()[4]
-    
+
     def get_second(self):
         """Get current second (0-59)."""
         return self.get_time_tuple()[5]
-    
+
     def get_minute_of_day(self):
         """Get current minute of day (0-1439).
-        
+
         Useful for time-based automation rules.
         """
-        t = self.get_time_tuple()
-        return t[3] * 60 + t[4]
+        return self.snapshot()[3]
     
-    def get_time_string(self, format_24h=True):
+    def get_time_string(self, format_24h=True, t=None):
         """Get formatted time string.
-        
+
+        Note: __init__ rebinds this name on the instance to the 24-hour
+        specialization, since that is the only format used in-tree. Call
+        TimeSync.get_time_string(ts, False) for the 12-hour form.
+
         Args:
             format_24h: If True, use 24-hour format, else 12-hour with AM/PM
-            
+            t: Optional prebuilt time tuple to format (avoids a re-read)
+
         Returns:
             Formatted time string (e.g., "14:30:45" or "2:30:45 PM")
         """
-        t = self.get_time_tuple()
-        hour = t[3]
-        minute = t[4]
-        second = t[5]
-        
         if format_24h:
-            return f"{hour:02d}:{minute:02d}:{second:02d}"
-        else:
-            # 12-hour format
-            am_pm = "AM" if hour < 12 else "PM"
-            hour_12 = hour % 12
-            if hour_12 == 0:
-                hour_12 = 12
-            return f"{hour_12}:{minute:02d}:{second:02d} {am_pm}"
-    
-    def get_date_string(self):
-        """Get formatted date string (YYYY-MM-DD)."""
-        t = self.get_time_tuple()
-        return f"{t[0]}-{t[1]:02d}-{t[2]:02d}"
+            return self._get_time_string_24(t)
+        return self._get_time_string_12(t)
+
+    def _get_time_string_24(self, t=None):
+        """Format HH:MM:SS; bound as get_time_string on the instance."""
+        if t is None:
+            t = self.get_time_tuple()
+        return _fmt_hms(t[3], t[4], t[5])
+
+    def _get_time_string_12(self, t=None):
+        """Format the 12-hour H:MM:SS AM/PM variant."""
+        if t is None:
+            t = self.get_time_tuple()
+        hour = t[3]
+        am_pm = "AM" if hour < 12 else "PM"
+        hour_12 = hour % 12
+        if hour_12 == 0:
+            hour_12 = 12
+        return str(hour_12) + ":" + _TWO_DIGIT[t[4]] + ":" + _TWO_DIGIT[t[5]] + " " + am_pm
+
+    @staticmethod
+    def _format_date(t):
+        """Format a time tuple's date part as YYYY-MM-DD."""
+        return str(t[0]) + "-" + _TWO_DIGIT[t[1]] + "-" + _TWO_DIGIT[t[2]]
+
+    def get_date_string(self, t=None):
+        """Get formatted date string (YYYY-MM-DD).
+
+        Args:
+            t: Optional prebuilt time tuple to format (avoids a re-read)
+        """
+        if t is None:
+            t = self.get_time_tuple()
+        return self._format_date(t)
 
     def get_timeone_string(self):
-        tz_name = instances.config.get_timezone_name()
+        # The config lookup only changes when set_timezone runs, so cache
+        # the name instead of re-reading the JSON-backed dict per poll
+        if self._tz_name_cache is None:
+            self._tz_name_cache = instances.config.get_timezone_name()
         offset_hours = self.TIMEZONE_OFFSET // 3600
         offset_minutes = abs(self.TIMEZONE_OFFSET % 3600) // 60
-        return f"{tz_name}:{offset_hours:+d}:{offset_minutes:02d}"
+        return "%s:%+d:%02d" % (self._tz_name_cache, offset_hours, offset_minutes)
     
     def get_datetime_string(self):
-        """Get formatted date and time string."""
-        return f"{self.get_date_string()} {self.get_time_string()}"
+        """Get formatted date and time string.
+
+        Rendered with one %-format from one tuple read, and memoized per
+        second alongside the tuple cache - repeated same-second calls
+        return the same string object with no allocation.
+        """
+        t = self.get_time_tuple()
+        if self._cached_sec == self._cached_dt_sec:
+            return self._cached_dt_str
+        self._cached_dt_str = '%d-%02d-%02d %02d:%02d:%02d' % (
+            t[0], t[1], t[2], t[3], t[4], t[5])
+        self._cached_dt_sec = self._cached_sec
+        return self._cached_dt_str
     
     def should_resync(self, interval_hours=24):
         """Check if time should be resynced.
@@ -287,6 +550,7 @@ class TimeSync:
             # Mark as synced (manually)
             self.is_synced = True
             self.last_sync_time = time.time()
+            self._invalidate_time_cache()
             
             # Save to config for fallback
             if save_to_config:
@@ -333,6 +597,7 @@ class TimeSync:
             
             self.is_synced = False  # Mark as not synced (it's stale)
             self.last_sync_time = last_known
+            self._invalidate_time_cache()
             
             print(f"⚠ Time restored from config (may be stale): {self.get_datetime_string()}")
             return True
@@ -1,14 +1,101 @@
-import socket
-import os
 import uasyncio as asyncio
 import json
-import machine
 import time
-import sys
+from micropython import const
 from system_status import SystemStatus
 from instances import instances
 
+# machine, sys, and os are imported lazily: machine only backs
+# /api/restart, sys the error-path tracebacks, and os a handful of
+# cold paths (boot-time indexing, saves, storage stats). json stays at
+# the top - every API response serializes through it
+
+# Request logging writes ~200 bytes per hit to the blocking 115200-baud
+# UART (~20ms); declared const so the compiler drops the guarded prints
+# from the bytecode entirely when 0
+_DEBUG = const(0)
+
+_CL = b'content-length:'
+
+# Characters allowed in a hostname ('-' and '_' included, so the check
+# needs no strip pass first)
+_HOST_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+
+# Status texts for _send_response, built once instead of per call
+_STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error'
+}
+
+# Byte sequences that must never appear in a served or saved path
+_BAD_PATH = (b'..', b'\x00')
+
+def _unsafe(p):
+    """One-pass scan for path bytes that could escape the tree."""
+    b = p.encode() if isinstance(p, str) else p
+    for bad in _BAD_PATH:
+        if bad in b:
+            return True
+    return False
+
+# Fully pre-encoded error responses for the static-serving hot paths -
+# no per-request formatting or str->bytes transcode
+_403 = b'HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n'
+_404 = b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n'
+_405 = b'HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n'
+_413 = b'HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\n\r\n'
+_500 = b'HTTP/1.1 500 Internal Server Error\r\nContent-Length: 0\r\n\r\n'
+
+def _full_response(body, connection='keep-alive'):
+    """Build a complete pre-encoded 200 JSON response around body bytes."""
+    return ('HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            'Content-Length: %d\r\nConnection: %s\r\n\r\n'
+            % (len(body), connection)).encode() + body
+
+# Responses whose payload never changes, encoded once at import: the
+# restart acknowledgement and the no-sensors fallback for /api/sensors
+_RESP_RESTARTING = _full_response(b'{"status": "restarting"}', 'close')
+_RESP_SENSORS_FALLBACK = _full_response(json.dumps({
+    "temperature": 25.0,
+    "humidity": 50.0,
+    "light_level": 500,
+    "switch_state": False,
+    "time_seconds": 0
+}).encode())
+
+def _is_content_length(line):
+    """Case-insensitive test for a Content-Length header line.
+
+    Compares the first 15 bytes in place (folding A-Z with | 0x20), so
+    the header scan doesn't allocate a lowercase copy of every line.
+    """
+    if len(line) < 16:
+        return False
+    for i in range(15):
+        if (line[i] | 0x20) != _CL[i]:
+            return False
+    return True
+
 class WebServer:
+    # Extension -> MIME type for static serving (keyed on the part after
+    # the last '.'; anything unknown falls back to text/plain)
+    _MIME = {
+        'html': 'text/html',
+        'js': 'application/javascript',
+        'css': 'text/css',
+        'json': 'application/json',
+        'ico': 'image/x-icon',
+        'png': 'image/png',
+        'jpg': 'image/jpeg',
+    }
+
+    # Pre-encoded 200 header blobs keyed by (content_type, is_gzip), built
+    # lazily on first use so each static response is one write, not 3-4
+    _HEADER_CACHE = {}
+
     def __init__(self, port=80, www_dir='/www'):
         """Initialize web server.
         
@@ -22,6 +109,58 @@ class WebServer:
         
         # Initialize system status
         self.system_status = SystemStatus(self.start_time)
+
+        # URL path -> (on-disk path, pre-built header); see _build_static_index
+        self._static_index = {}
+        self._index_resp = None  # Full index.html response held in RAM
+        self._build_static_index()
+        self._cache_index_asset()
+
+        # Persistent POST-body buffer: bodies are read into this instead
+        # of growing a fresh bytes object per request, and anything over
+        # MAX_BODY is rejected up front so a large upload can't OOM the
+        # board. _body_busy marks it checked out - the read loop yields
+        # at each readinto, so a concurrent POST must not share it
+        self._body_buf = bytearray(self.BODY_BUF)
+        self._body_mv = memoryview(self._body_buf)
+        self._body_busy = False
+
+        # Pool of reusable stream-buffer pairs for file serving, checked
+        # out per response so concurrent serves each get their own 2x4KB
+        # without re-allocating per request. Slots fill lazily; if a
+        # burst exceeds the pool, the extra pair is simply collected.
+        self._buf_pool = [None] * 4
+
+        # Set to stop the accept loop (cleanly closes the listener)
+        self._shutdown = asyncio.Event()
+
+        # statvfs result for /api/storage, cached until a save changes it
+        # (the filesystem walk is the whole cost of that endpoint)
+        self._fs_stat = None
+
+        # Last traceback timestamp (tracebacks are rate-limited in _DEBUG)
+        self._last_trace_ms = -1000
+
+        # Pre-encoded GET responses that only change on config writes:
+        # built on first hit, dropped by the POST handlers that affect
+        # them (boards never change at runtime, so that one lives forever)
+        self._gpio_cache = None
+        self._config_cache = None
+        self._boards_cache = None
+
+        # WLAN interface handles for /api/wifi/status, fetched on first use
+        self._wlan = None
+        self._ap = None
+
+        # Encoded /api/sensors response shared across polls within a
+        # short window, so several dashboard tabs cost one serialization
+        self._sensors_resp = None
+        self._sensors_ts = 0
+
+        # WiFi status dict cached briefly - each field is a separate
+        # ESP-IDF call that takes the WiFi stack mutex
+        self._wifi_status_cache = None
+        self._wifi_status_ts = 0
         
         # API route registry: (method, path) -> handler function
         self.routes = {
@@ -45,77 +184,197 @@ class WebServer:
             ('GET', '/api/boards'): self.api_boards_get,
             ('POST', '/api/time/set'): self.api_time_set_post,
         }
+
+        # Bytes-keyed mirror of routes ("METHOD /path") so handle_client
+        # can resolve the handler from one request-line slice - no tuple
+        # allocation or method/path hashing on the API hot path
+        self._routes_b = {('%s %s' % (m, p)).encode(): h
+                          for (m, p), h in self.routes.items()}
         
     async def start(self):
         print(f"Starting web server on port {self.port}...")
-        server = await asyncio.start_server(self.handle_client, '0.0.0.0', self.port)
+        # A page load fires several asset fetches at once; a deeper
+        # listen backlog keeps burst SYNs queued instead of dropped
+        server = await asyncio.start_server(self.handle_client, '0.0.0.0', self.port,
+                                            backlog=16)
         print("Web server started!")
-        while True:
-            await asyncio.sleep(3600)
+        # Park on an event instead of a wake-every-hour sleep loop; set
+        # by /api/restart so the listener closes before the reset
+        await self._shutdown.wait()
+        server.close()
+        await server.wait_closed()
+
+    # How long an idle keep-alive connection waits for its next request
+    KEEPALIVE_TIMEOUT_S = 5
+
+    # Largest accepted request body; bigger POSTs get a 413. Saves of
+    # user code can legitimately run tens of KB, hence the headroom
+    MAX_BODY = 65536
+
+    # Size of the persistent body buffer; bodies that fit reuse it,
+    # larger (rare) ones get a transient exact-size buffer
+    BODY_BUF = 8192
 
     async def handle_client(self, reader, writer):
+        # Persistent-connection loop: an SPA page load fetches several
+        # assets back to back, and reusing one socket saves a TCP
+        # handshake per asset. Bytes read past one request's body are
+        # kept in buf as the start of the next (pipelining-safe).
+        buf = b''
+        response_started = False
         try:
-            request_line = await reader.readline()
-            if not request_line:
-                writer.close()
-                await writer.wait_closed()
-                return
-
-            method, path, _ = request_line.decode().split(' ')
-            print(f"Request: {method} {path}")
-            
-            # Read headers and look for Content-Length
-            content_length = 0
             while True:
-                header = await reader.readline()
-                if header == b'\r\n' or not header:
-                    break
-                if header.lower().startswith(b'content-length:'):
+                # Buffer until a full header block has arrived - one await
+                # per TCP segment instead of one readline() per header line
+                while b'\r\n\r\n' not in buf:
                     try:
-                        content_length = int(header.split(b':')[1].strip())
-                    except ValueError:
-                        pass
-            
-            # Read body if present
-            body = b''
-            if content_length > 0:
-                print(f"Reading {content_length} bytes of body...")
-                body = await reader.read(content_length)
-                if len(body) < content_length:
-                    remaining = content_length - len(body)
-                    body += await reader.read(remaining)
-                print(f"Body received: {body[:50]}...")
-            
-            # Route request
-            if path.startswith('/api/'):
-                await self.handle_api(writer, method, path, body)
-            elif method == 'GET':
-                await self.serve_file(writer, path)
-            else:
-                await self._send_response(writer, 405, 'Method Not Allowed')
-        
+                        chunk = await asyncio.wait_for(
+                            reader.read(512), self.KEEPALIVE_TIMEOUT_S)
+                    except asyncio.TimeoutError:
+                        return  # Idle connection, let finally close it
+                    if not chunk:
+                        return  # Client closed
+                    buf += chunk
+                    if len(buf) > 8192:
+                        return  # Header block unreasonably large
+
+                head, _, rest = buf.partition(b'\r\n\r\n')
+                line_end = head.find(b'\r\n')
+                request_line = head[:line_end] if line_end >= 0 else head
+
+                # Fast path for GET: slice the path straight out of the
+                # bytes instead of decoding and splitting the whole line
+                # (skips a str, a 3-element list, and two substrings)
+                if request_line.startswith(b'GET /'):
+                    method = 'GET'
+                    space2 = request_line.find(b' ', 4)
+                    if space2 < 0:
+                        return  # Malformed request line
+                    route_key = request_line[:space2]
+                    path = request_line[4:space2].decode()
+                else:
+                    # Same slice-based parse for other methods: decode
+                    # only the two short fields, never the whole line
+                    sp1 = request_line.find(b' ')
+                    sp2 = request_line.find(b' ', sp1 + 1)
+                    if sp1 < 0 or sp2 < 0:
+                        return  # Malformed request line
+                    route_key = request_line[:sp2]
+                    method = request_line[:sp1].decode()
+                    path = request_line[sp1 + 1:sp2].decode()
+                if _DEBUG:
+                    print(f"Request: {method} {path}")
+
+                # Scan the header block for Content-Length (GET requests
+                # carry no body, so skip the scan entirely for them)
+                content_length = 0
+                if method != 'GET':
+                    header_lines = head.split(b'\r\n')
+                    if len(header_lines) > 32:
+                        return  # Header flood; drop the connection
+                    for line in header_lines:
+                        if _is_content_length(line):
+                            try:
+                                content_length = int(line[15:].strip())
+                            except ValueError:
+                                pass
+
+                if content_length > self.MAX_BODY:
+                    # Refuse oversized bodies before allocating anything;
+                    # closing the connection discards the unread payload
+                    writer.write(_413)
+                    await self._safe_drain(writer)
+                    return
+
+                # Split body from any bytes of the next request, then read
+                # whatever didn't arrive with the headers into the
+                # persistent buffer (no per-chunk bytes growth)
+                body = rest[:content_length]
+                buf = rest[content_length:]
+                if content_length > len(body):
+                    if _DEBUG:
+                        print(f"Reading {content_length} bytes of body...")
+                    # Check the shared buffer out for the duration of
+                    # the read: readinto yields, and another task's POST
+                    # interleaving into the same bytes would corrupt
+                    # both payloads. When it's busy - or the body is
+                    # oversize (but still capped) - fall back to one
+                    # exact-size transient buffer instead of growing by
+                    # chunks
+                    shared = (content_length <= self.BODY_BUF
+                              and not self._body_busy)
+                    if shared:
+                        self._body_busy = True
+                        mv = self._body_mv
+                    else:
+                        mv = memoryview(bytearray(content_length))
+                    try:
+                        off = len(body)
+                        mv[:off] = body
+                        while off < content_length:
+                            n = await reader.readinto(mv[off:content_length])
+                            if not n:
+                                break
+                            off += n
+                        body = bytes(mv[:off])
+                    finally:
+                        if shared:
+                            self._body_busy = False
+                    if _DEBUG:
+                        print(f"Body received: {body[:50]}...")
+
+                # Route request. Once dispatch begins, response bytes may
+                # already be on the wire, so the 500 fallback below must
+                # not fire past this point - it would splice a second
+                # status line into a partially written response.
+                response_started = True
+                if path.startswith('/api/'):
+                    await self.handle_api(writer, method, path, body,
+                                          self._routes_b.get(route_key))
+                elif method == 'GET':
+                    if await self.serve_file(writer, path):
+                        return  # Response truncated mid-stream; stream is desynced
+                else:
+                    writer.write(_405)
+                    await self._safe_drain(writer)
+                response_started = False
+
+                # Honor explicit close requests and HTTP/1.0 clients
+                if (request_line.endswith(b'HTTP/1.0')
+                        or b'Connection: close' in head
+                        or b'connection: close' in head):
+                    return
+
         except Exception as e:
             # Don't log ECONNABORTED - client disconnected, which is normal
             if "ECONNABORTED" not in str(e):
-                print(f"REQUEST ERROR: {e}")
-                sys.print_exception(e)
+                self._log_exception("REQUEST ERROR:", e)
             
-            # Try to send 500 if connection still open
-            try:
-                await self._send_response(writer, 500, {'error': 'Internal server error'})
-            except:
-                pass  # Connection already closed
+            # Try to send 500, but only if no response bytes have gone
+            # out yet for this request; otherwise closing is the only
+            # correct action
+            if not response_started:
+                try:
+                    await self._send_response(writer, 500, {'error': 'Internal server error'})
+                except:
+                    pass  # Connection already closed
         
         finally:
             writer.close()
             await writer.wait_closed()
 
-    async def handle_api(self, writer, method, path, body):
-        """Route API requests to appropriate handlers with unified error handling."""
-        print(f"API: {method} {path}")
+    async def handle_api(self, writer, method, path, body, handler=None):
+        """Route API requests to appropriate handlers with unified error handling.
+
+        handle_client resolves the handler from the raw request-line
+        slice via _routes_b; the (method, path) tuple lookup remains for
+        any caller that doesn't.
+        """
+        if _DEBUG:
+            print(f"API: {method} {path}")
         
-        # Look up handler
-        handler = self.routes.get((method, path))
+        if handler is None:
+            handler = self.routes.get((method, path))
         
         if not handler:
             await self._send_response(writer, 404, {'error': 'Not found'})
@@ -137,8 +396,7 @@ class WebServer:
             await self._send_response(writer, 400, {'error': str(e)})
         except Exception as e:
             # Server error
-            print(f"API ERROR ({method} {path}): {e}")
-            sys.print_exception(e)
+            self._log_exception(f"API ERROR ({method} {path}):", e)
             await self._send_response(writer, 500, {'error': 'Internal server error'})
 
     # ============================================================================
@@ -148,27 +406,24 @@ class WebServer:
     async def _send_response(self, writer, status_code, data):
         """Send HTTP response with safe drain handling."""
         try:
-            # Status text mapping
-            status_text = {
-                200: 'OK',
-                400: 'Bad Request',
-                404: 'Not Found',
-                405: 'Method Not Allowed',
-                500: 'Internal Server Error'
-            }.get(status_code, 'Unknown')
+            status_text = _STATUS_TEXT.get(status_code, 'Unknown')
             
-            # Write status line
-            writer.write(f'HTTP/1.1 {status_code} {status_text}\r\n'.encode())
-            
-            # Write response body
+            # Serialize the body first: keep-alive requires an accurate
+            # Content-Length so the client knows where the response ends
             if isinstance(data, (dict, list)):
-                writer.write(b'Content-Type: application/json\r\n')
-                writer.write(b'Connection: close\r\n\r\n')
-                writer.write(json.dumps(data).encode())
+                payload = json.dumps(data).encode()
+                ctype = 'application/json'
             else:
-                writer.write(b'Content-Type: text/plain\r\n')
-                writer.write(b'Connection: close\r\n\r\n')
-                writer.write(str(data).encode())
+                payload = str(data).encode()
+                ctype = 'text/plain'
+
+            # One write, one drain: headers and body leave as a single
+            # buffer, so lwIP can pack the response into one TCP segment
+            # instead of fragmenting it across four small writes
+            writer.write((
+                'HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\n'
+                'Connection: keep-alive\r\n\r\n'
+                % (status_code, status_text, ctype, len(payload))).encode() + payload)
             
             # Safe drain - ignore ECONNABORTED
             await self._safe_drain(writer)
@@ -178,6 +433,22 @@ class WebServer:
             if "ECONNABORTED" not in str(e):
                 print(f"Response send error: {e}")
 
+    def _log_exception(self, tag, e):
+        """Log an error as one short line; full tracebacks only in _DEBUG.
+
+        sys.print_exception writes multiple lines to the blocking UART
+        (~1ms each), so a client hammering error responses would stall
+        every other connection. Even in _DEBUG, tracebacks are limited
+        to one per second.
+        """
+        print(tag, type(e).__name__, e)
+        if _DEBUG:
+            now = time.ticks_ms()
+            if time.ticks_diff(now, self._last_trace_ms) >= 1000:
+                self._last_trace_ms = now
+                import sys
+                sys.print_exception(e)
+
     async def _safe_drain(self, writer):
         """Drain writer, silently handling connection aborts."""
         try:
@@ -198,34 +469,46 @@ class WebServer:
 
     async def api_save_post(self, writer, body):
         """POST /api/save - Save a file to filesystem."""
-        data = json.loads(body.decode())
+        # json.loads accepts bytes directly - skipping .decode() avoids a
+        # full UTF-8 copy of what can be tens of KB of user code
+        data = json.loads(body)
         filename = data.get('filename', 'user_code.py')
         code = data.get('code', '')
         
-        print(f"Saving {len(code)} bytes to {filename}")
+        if _DEBUG:
+            print(f"Saving {len(code)} bytes to {filename}")
         
         # Security check
-        if '..' in filename or filename.startswith('/'):
+        if _unsafe(filename) or filename.startswith('/') or ':' in filename:
             raise ValueError("Invalid filename")
         
-        with open(filename, 'w') as f:
-            f.write(code)
+        # Encode once and write binary in 4KB slices aligned to the
+        # LittleFS block size, then sync so the commit hits flash before
+        # the response goes out
+        data_bytes = code.encode()
+        with open(filename, 'wb') as f:
+            for i in range(0, len(data_bytes), 4096):
+                f.write(data_bytes[i:i + 4096])
+        import os
+        os.sync()
+        self._fs_stat = None  # Free-space numbers just changed
         
-        print("File saved successfully")
+        if _DEBUG:
+            print("File saved successfully")
         return {'status': 'ok', 'message': f'Saved {filename}'}
 
     async def api_restart_post(self, writer, body):
         """POST /api/restart - Restart the device."""
-        # Send response immediately
-        writer.write(b'HTTP/1.1 200 OK\r\n')
-        writer.write(b'Content-Type: application/json\r\n\r\n')
-        writer.write(b'{"status": "restarting"}')
+        # Send the pre-encoded response immediately
+        writer.write(_RESP_RESTARTING)
         await self._safe_drain(writer)
         writer.close()
         await writer.wait_closed()
         
         print("Restarting via API...")
+        self._shutdown.set()  # Let the listener close before the reset
         await asyncio.sleep(0.5)
+        import machine
         machine.reset()
         
         return None  # Response already sent
@@ -236,25 +519,24 @@ class WebServer:
 
     async def api_relays_config_get(self, writer, body):
         """GET /api/relays/config - Get relay configuration."""
-        relay_config = instances.relays.get_relays()
-        return {
-            "count": len(relay_config.get('relays', [])),
-            "relays": relay_config.get('relays', [])
-        }
+        # One lookup, shared list reference - this handler is read-only
+        relays = instances.relays.get_relays().get('relays', [])
+        return {"count": len(relays), "relays": relays}
 
     async def api_relays_config_post(self, writer, body):
         """POST /api/relays/config - Update relay configuration."""
-        data = json.loads(body.decode())
+        data = json.loads(body)
         new_relays = data.get('relays', [])
         
         if instances.relays.update_config(new_relays):
+            self._gpio_cache = None  # Pin usage may have changed
             return {"success": True}
         else:
             raise ValueError("Invalid config format")
 
     async def api_relays_control_post(self, writer, body):
         """POST /api/relays/control - Control a relay."""
-        data = json.loads(body.decode())
+        data = json.loads(body)
         label = data.get('label')
         state = data.get('state')
         
@@ -271,29 +553,52 @@ class WebServer:
     # ============================================================================
 
     async def api_gpio_available_get(self, writer, body):
-        """GET /api/gpio/available - Get available GPIO pins."""
-        # Get pins currently in use
-        used_pins = [relay['pin'] for relay in instances.relays.get_relays().get('relays', [])]
-        
-        # Get available pins from board config
-        available = instances.board.get_available_pins(exclude_pins=used_pins)
-        
-        # Return as object with pin numbers as keys
-        return {str(pin): str(pin) for pin in available}
+        """GET /api/gpio/available - Get available GPIO pins.
+
+        Pre-encoded and cached; only a relay or board config write can
+        change which pins are free.
+        """
+        resp = self._gpio_cache
+        if resp is None:
+            # Get pins currently in use
+            used_pins = [relay['pin'] for relay in instances.relays.get_relays().get('relays', [])]
+
+            # Get available pins from board config
+            available = instances.board.get_available_pins(exclude_pins=used_pins)
+
+            # Serialize as object with pin numbers as keys
+            resp = self._gpio_cache = _full_response(
+                json.dumps({str(pin): str(pin) for pin in available}).encode())
+        writer.write(resp)
+        await self._safe_drain(writer)
+        return None
+
+    # How long an encoded sensors response stays shared (milliseconds);
+    # the automation loop only refreshes readings every 500ms anyway
+    SENSORS_TTL_MS = 200
 
     async def api_sensors_get(self, writer, body):
-        """GET /api/sensors - Get sensor data."""
-        if instances.sensors:
-            return instances.sensors.to_dict()
-        else:
-            # Fallback to dummy data
-            return {
-                "temperature": 25.0,
-                "humidity": 50.0,
-                "light_level": 500,
-                "switch_state": False,
-                "time_seconds": 0
-            }
+        """GET /api/sensors - Get sensor data.
+
+        The encoded response is reused for SENSORS_TTL_MS so concurrent
+        dashboard tabs share one dict build + json.dumps instead of
+        serializing identical readings each.
+        """
+        if not instances.sensors:
+            # Fallback dummy data, pre-encoded at import - skip json.dumps
+            writer.write(_RESP_SENSORS_FALLBACK)
+            await self._safe_drain(writer)
+            return None
+
+        now = time.ticks_ms()
+        resp = self._sensors_resp
+        if resp is None or time.ticks_diff(now, self._sensors_ts) >= self.SENSORS_TTL_MS:
+            resp = self._sensors_resp = _full_response(
+                json.dumps(instances.sensors.to_dict()).encode())
+            self._sensors_ts = now
+        writer.write(resp)
+        await self._safe_drain(writer)
+        return None
 
     async def api_validate_rule_post(self, writer, body):
         """POST /api/validate-rule - Validate a rule expression."""
@@ -351,7 +656,7 @@ class WebServer:
             }
         }
         """
-        data = json.loads(body.decode())
+        data = json.loads(body)
         sensor_pins = data.get('sensor_pins')
         
         if sensor_pins is None:
@@ -385,8 +690,16 @@ class WebServer:
     # ============================================================================
 
     async def api_storage_get(self, writer, body):
-        """GET /api/storage - Get storage information."""
-        stat = os.statvfs('/')
+        """GET /api/storage - Get storage information.
+
+        statvfs walks filesystem metadata, but free space only changes
+        when this server writes a file - so the result is cached and
+        invalidated by /api/save.
+        """
+        stat = self._fs_stat
+        if stat is None:
+            import os
+            stat = self._fs_stat = os.statvfs('/')
         block_size = stat[0]
         total_blocks = stat[2]
         free_blocks = stat[3]
@@ -407,14 +720,30 @@ class WebServer:
     # API Handlers - WiFi
     # ============================================================================
 
+    # The portal only renders a handful of networks; don't ship more
+    SCAN_TOP_K = 10
+
     async def api_wifi_scan_get(self, writer, body):
-        """GET /api/wifi/scan - Scan for WiFi networks."""
-        networks = instances.wifi.scan_networks()
+        """GET /api/wifi/scan - Scan for WiFi networks.
+
+        The network list is usually fetched over the slow SoftAP link
+        during provisioning, so it is served gzip-compressed when the
+        port has the deflate module.
+        """
+        gz = instances.wifi.scan_networks_compressed(top_k=self.SCAN_TOP_K)
+        if gz is not None:
+            writer.write((
+                'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                'Content-Encoding: gzip\r\nContent-Length: %d\r\n'
+                'Connection: keep-alive\r\n\r\n' % len(gz)).encode() + gz)
+            await self._safe_drain(writer)
+            return None
+        networks = instances.wifi.scan_networks(top_k=self.SCAN_TOP_K)
         return {"networks": networks}
 
     async def api_wifi_connect_post(self, writer, body):
         """POST /api/wifi/connect - Connect to WiFi network."""
-        data = json.loads(body.decode())
+        data = json.loads(body)
         ssid = data.get('ssid')
         password = data.get('password')
         save = data.get('save', True)
@@ -423,7 +752,7 @@ class WebServer:
             raise ValueError("SSID required")
         
         # Try to connect
-        if instances.wifi.connect(ssid, password, timeout=15):
+        if await instances.wifi.connect(ssid, password, timeout=15):
             # Save credentials if requested
             if save:
                 instances.wifi.save_credentials(ssid, password)
@@ -439,19 +768,39 @@ class WebServer:
                 "message": "Failed to connect to WiFi"
             }
 
+    # How long a wifi-status snapshot stays fresh (milliseconds)
+    WIFI_STATUS_TTL_MS = 1000
+
     async def api_wifi_status_get(self, writer, body):
-        """GET /api/wifi/status - Get WiFi connection status."""
-        import network
-        wlan = network.WLAN(network.STA_IF)
-        ap = network.WLAN(network.AP_IF)
+        """GET /api/wifi/status - Get WiFi connection status.
+
+        Each field is its own call into ESP-IDF behind the WiFi stack
+        mutex, so the snapshot is cached for WIFI_STATUS_TTL_MS to
+        absorb the UI's rapid polling.
+        """
+        now = time.ticks_ms()
+        if (self._wifi_status_cache is not None and
+                time.ticks_diff(now, self._wifi_status_ts) < self.WIFI_STATUS_TTL_MS):
+            return self._wifi_status_cache
+
+        if self._wlan is None:
+            # network is already resident (wifi_manager loads it at
+            # boot), so grab the interface handles once instead of
+            # re-importing and re-wrapping them per poll
+            import network
+            self._wlan = network.WLAN(network.STA_IF)
+            self._ap = network.WLAN(network.AP_IF)
+        wlan = self._wlan
+        ap = self._ap
         
+        connected = wlan.isconnected()
         status = {
             "sta_active": wlan.active(),
-            "sta_connected": wlan.isconnected(),
+            "sta_connected": connected,
             "ap_active": ap.active()
         }
         
-        if wlan.isconnected():
+        if connected:
             status["sta_ip"] = wlan.ifconfig()[0]
             status["sta_ssid"] = wlan.config('essid')
             status["sta_rssi"] = wlan.status('rssi')
@@ -460,6 +809,8 @@ class WebServer:
             status["ap_ip"] = ap.ifconfig()[0]
             status["ap_ssid"] = ap.config('essid')
         
+        self._wifi_status_cache = status
+        self._wifi_status_ts = now
         return status
 
     # ============================================================================
@@ -467,23 +818,32 @@ class WebServer:
     # ============================================================================
 
     async def api_config_get(self, writer, body):
-        """GET /api/config - Get system configuration."""
-        return {
-            "hostname": instances.config.get_hostname(),
-            "board": instances.config.get_board_config_file().replace('/boards/', ''),
-            "board_name": instances.board.get_name()
-        }
+        """GET /api/config - Get system configuration.
+
+        Pre-encoded and cached until /api/config POST rewrites it.
+        """
+        resp = self._config_cache
+        if resp is None:
+            resp = self._config_cache = _full_response(json.dumps({
+                "hostname": instances.config.get_hostname(),
+                "board": instances.config.get_board_config_file().replace('/boards/', ''),
+                "board_name": instances.board.get_name()
+            }).encode())
+        writer.write(resp)
+        await self._safe_drain(writer)
+        return None
 
     async def api_config_post(self, writer, body):
         """POST /api/config - Update system configuration."""
-        data = json.loads(body.decode())
+        data = json.loads(body)
         hostname = data.get('hostname')
         board = data.get('board')
         
         # Validate and update hostname
         if hostname is not None:
-            cleaned = hostname.replace('-', '').replace('_', '')
-            if not hostname or not all(c.isalpha() or c.isdigit() for c in cleaned):
+            # Set membership is one hash per char, and folding '-'/'_'
+            # into the set drops the two replace() copies entirely
+            if not hostname or not all(c in _HOST_CHARS for c in hostname):
                 raise ValueError("Invalid hostname format")
             instances.config.set_hostname(hostname)
         
@@ -500,6 +860,9 @@ class WebServer:
         
         # Save config
         if instances.config.save_config():
+            # Hostname/board changed; drop the responses derived from them
+            self._config_cache = None
+            self._gpio_cache = None
             return {
                 "status": "success",
                 "message": "Configuration updated. Restart required for changes to take effect.",
@@ -540,9 +903,21 @@ class WebServer:
             raise Exception("Failed to set time")
 
     async def api_boards_get(self, writer, body):
-        """GET /api/boards - Get list of available boards."""
+        """GET /api/boards - Get list of available boards.
+
+        The /boards directory only changes via deploy (which restarts the
+        board), so the directory walk and its N json.load calls run once;
+        later hits write the cached pre-encoded response.
+        """
+        resp = self._boards_cache
+        if resp is not None:
+            writer.write(resp)
+            await self._safe_drain(writer)
+            return None
+
         boards = []
         try:
+            import os
             files = os.listdir('/boards')
             for filename in files:
                 if filename.endswith('.json'):
@@ -561,71 +936,197 @@ class WebServer:
         except OSError:
             pass  # /boards directory doesn't exist
         
-        return {"boards": boards}
+        resp = self._boards_cache = _full_response(json.dumps({"boards": boards}).encode())
+        writer.write(resp)
+        await self._safe_drain(writer)
+        return None
 
     # ============================================================================
     # Static File Serving
     # ============================================================================
 
+    def _checkout_bufs(self):
+        """Take a (buffers, memoryviews) pair from the pool, or make one."""
+        pool = self._buf_pool
+        for i in range(len(pool)):
+            pair = pool[i]
+            if pair is not None:
+                pool[i] = None
+                return pair
+        bufs = (bytearray(4096), bytearray(4096))
+        return (bufs, (memoryview(bufs[0]), memoryview(bufs[1])))
+
+    def _return_bufs(self, pair):
+        """Put a buffer pair back for the next response to reuse."""
+        pool = self._buf_pool
+        for i in range(len(pool)):
+            if pool[i] is None:
+                pool[i] = pair
+                return
+
+    def _build_static_index(self):
+        """Index the files in www_dir once at startup.
+
+        Maps URL path -> (on-disk path, fully pre-built header bytes with
+        Content-Length), preferring the .gz variant of each asset. Serving
+        an indexed asset then costs one dict lookup instead of open-probing
+        two filesystem paths per request. The index is only built at boot;
+        redeploys restart the board anyway.
+        """
+        import os
+        try:
+            entries = list(os.ilistdir(self.www_dir))
+        except OSError:
+            return  # No www directory - probe per request instead
+
+        for entry in entries:
+            name = entry[0]
+            if entry[1] != 0x8000:
+                continue  # Directories aren't served
+            is_gzip = name.endswith('.gz')
+            url = '/' + (name[:-3] if is_gzip else name)
+            if not is_gzip and url in self._static_index:
+                continue  # A .gz variant already won
+            fpath = self.www_dir + '/' + name
+            try:
+                size = os.stat(fpath)[6]
+            except OSError:
+                continue
+            dot = url.rfind('.')
+            ctype = self._MIME.get(url[dot + 1:], 'text/plain') if dot >= 0 else 'text/plain'
+            header = ('HTTP/1.1 200 OK\r\nContent-Type: ' + ctype + '\r\n'
+                      + ('Content-Encoding: gzip\r\n' if is_gzip else '')
+                      + 'Connection: keep-alive\r\nContent-Length: %d\r\n\r\n' % size)
+            self._static_index[url] = (fpath, header.encode())
+
+    # Largest index bundle kept fully in RAM (bytes). Bigger bundles
+    # fall back to the streamed path rather than squeezing the heap.
+    INDEX_CACHE_MAX = 32768
+
+    def _cache_index_asset(self):
+        """Hold the complete index.html response (header + body) in RAM.
+
+        The SPA shell is served for the root and for every unknown route,
+        making it by far the hottest static asset. Caching the whole
+        response lets those hits skip the file open, the readinto loop
+        and all but one drain. Runs once at boot, after the static index.
+        """
+        entry = self._static_index.get('/index.html')
+        if entry is None:
+            return
+        fpath, header = entry
+        try:
+            import os
+            if os.stat(fpath)[6] > self.INDEX_CACHE_MAX:
+                return
+            with open(fpath, 'rb') as f:
+                self._index_resp = header + f.read()
+            self._index_fpath = fpath
+        except (OSError, MemoryError):
+            self._index_resp = None
+
     async def serve_file(self, writer, path):
-        """Serve static files with SPA fallback."""
+        """Serve static files with SPA fallback.
+
+        Assets indexed at boot are resolved with a single dict lookup and
+        a pre-built header; anything else falls back to probing the
+        filesystem (.gz first). Returns True if the response was
+        truncated mid-stream and the connection must be closed.
+        """
         # Default to index.html for root
         if path == '/':
             path = '/index.html'
-            
+
         # Prevent directory traversal
-        if '..' in path:
-            await self._send_response(writer, 403, 'Forbidden')
+        if _unsafe(path):
+            writer.write(_403)
+            await self._safe_drain(writer)
             return
-            
-        # Try to find file (check .gz first)
-        gz_path = self.www_dir + path + '.gz'
-        file_path = self.www_dir + path
-        
-        try:
-            os.stat(gz_path)
-            serve_path = gz_path
+
+        entry = self._static_index.get(path)
+        if entry is None and ('.' not in path or path.endswith('.html')):
+            # SPA fallback: unknown routes get the app shell
+            entry = self._static_index.get('/index.html')
+
+        # The index bundle is pre-assembled in RAM: one write, no file I/O
+        if (entry is not None and self._index_resp is not None
+                and entry[0] == self._index_fpath):
+            writer.write(self._index_resp)
+            await self._safe_drain(writer)
+            return
+
+        f = None
+        if entry is not None:
+            try:
+                f = open(entry[0], 'rb')
+                header = entry[1]
+            except OSError:
+                f = None  # Indexed file vanished; fall back to probing
+
+        if f is None:
+            # Probe path for files that appeared after boot (.gz first -
+            # a failed open costs one LittleFS directory walk where
+            # stat-then-open cost two)
+            import os
             is_gzip = True
-        except OSError:
+            fpath = self.www_dir + path + '.gz'
             try:
-                os.stat(file_path)
-                serve_path = file_path
-                is_gzip = False
+                f = open(fpath, 'rb')
             except OSError:
-                # SPA Fallback: serve index.html for routes
-                if '.' not in path or path.endswith('.html'):
-                    serve_path = self.www_dir + '/index.html.gz'
-                    is_gzip = True
-                else:
-                    await self._send_response(writer, 404, 'Not Found')
+                try:
+                    fpath = self.www_dir + path
+                    f = open(fpath, 'rb')
+                    is_gzip = False
+                except OSError:
+                    writer.write(_404)
+                    await self._safe_drain(writer)
                     return
 
-        # Determine content type
-        content_type = 'text/plain'
-        if path.endswith('.html'): content_type = 'text/html'
-        elif path.endswith('.js'): content_type = 'application/javascript'
-        elif path.endswith('.css'): content_type = 'text/css'
-        elif path.endswith('.json'): content_type = 'application/json'
-        elif path.endswith('.ico'): content_type = 'image/x-icon'
-        elif path.endswith('.png'): content_type = 'image/png'
-        elif path.endswith('.jpg'): content_type = 'image/jpeg'
+            # Determine content type from the extension
+            dot = path.rfind('.')
+            content_type = self._MIME.get(path[dot + 1:], 'text/plain') if dot >= 0 else 'text/plain'
 
+            # One cached header prefix per (content type, gzip) pair; the
+            # Content-Length line is per-file, needed so keep-alive
+            # clients know where the body ends
+            key = (content_type, is_gzip)
+            prefix = self._HEADER_CACHE.get(key)
+            if prefix is None:
+                prefix = ('HTTP/1.1 200 OK\r\nContent-Type: ' + content_type + '\r\n'
+                          + ('Content-Encoding: gzip\r\n' if is_gzip else '')
+                          + 'Connection: keep-alive\r\n').encode()
+                self._HEADER_CACHE[key] = prefix
+            header = prefix + ('Content-Length: %d\r\n\r\n' % os.stat(fpath)[6]).encode()
+
+        pair = self._checkout_bufs()
+        bufs, mvs = pair
+        started = False
         try:
-            with open(serve_path, 'rb') as f:
-                writer.write(b'HTTP/1.1 200 OK\r\n')
-                writer.write(f'Content-Type: {content_type}\r\n'.encode())
-                if is_gzip:
-                    writer.write(b'Content-Encoding: gzip\r\n')
-                writer.write(b'Connection: close\r\n\r\n')
+            writer.write(header)
+            started = True
+
+            # Stream with two buffers: queue one chunk for TX, read the
+            # next from flash, then drain - so the ~1-5ms SPI-flash read
+            # overlaps the Wi-Fi send instead of serializing with it.
+            # Memoryview slices avoid copying chunks into fresh bytes.
+            i = 0
+            l = f.readinto(bufs[0])
+            while l:
+                writer.write(mvs[i][:l])
+                i ^= 1
+                next_l = f.readinto(bufs[i])
                 await self._safe_drain(writer)
-                
-                # Stream file in chunks
-                buf = bytearray(1024)
-                while True:
-                    l = f.readinto(buf)
-                    if not l: break
-                    writer.write(buf[:l])
-                    await self._safe_drain(writer)
-                    
+                l = next_l
+
         except OSError:
-            await self._send_response(writer, 500, 'Internal Server Error')
+            if started:
+                # The 200 header (and possibly part of the body) is
+                # already on the wire; appending a 500 would corrupt the
+                # stream, and the promised Content-Length can no longer
+                # be honored - tell the caller to drop the connection
+                return True
+            writer.write(_500)
+            await self._safe_drain(writer)
+        finally:
+            f.close()
+            self._return_bufs(pair)
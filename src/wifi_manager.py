@@ -1,7 +1,32 @@
+import binascii
 import network
 import time
+import uasyncio as asyncio
 from instances import instances
 
+# Terminal STA status codes: once the driver reports one of these the
+# current connect attempt cannot succeed, so waiting longer is pointless
+try:
+    _STAT_FAILED = (
+        network.STAT_WRONG_PASSWORD,
+        network.STAT_NO_AP_FOUND,
+        network.STAT_CONNECT_FAIL,
+    )
+except AttributeError:
+    _STAT_FAILED = ()
+
+# The mdns module only exists on esp32 builds that include it; resolve
+# the import once at load instead of walking sys.path (and raising
+# ImportError) on every setup_mdns call
+try:
+    import mdns as _mdns
+except ImportError:
+    _mdns = None
+
+# Authmode names indexed by code - the codes are small and contiguous,
+# so a tuple index beats a dict hash on MicroPython
+_AUTHMODES = ('Open', 'WEP', 'WPA-PSK', 'WPA2-PSK', 'WPA/WPA2-PSK')
+
 class WiFiManager:
     """Manages WiFi connection with AP fallback."""
     
@@ -12,7 +37,13 @@ class WiFiManager:
     
     # Connection timeouts
     CONNECT_TIMEOUT = 15  # seconds
-    CONNECT_RETRY_DELAY = 1  # seconds
+    CONNECT_POLL_MS = 100  # link-state poll granularity
+    
+    # Reconnect backoff (seconds) and monitor poll interval for the
+    # background monitor() task
+    RECONNECT_DELAY_S = 1
+    RECONNECT_DELAY_MAX_S = 60
+    MONITOR_INTERVAL_S = 5
     
     def __init__(self):
         """Initialize WiFi manager.
@@ -22,11 +53,37 @@ class WiFiManager:
         self.sta = network.WLAN(network.STA_IF)
         self.ap = network.WLAN(network.AP_IF)
         self.mode = None  # 'sta', 'ap', or None
+
+        # Cached scan_networks() result - a passive scan takes ~1.5s and
+        # stalls STA traffic, so portal page loads reuse the last result
+        self._scan_cache = None
+        self._scan_ts = 0
+        # SSID -> hex BSSID of its strongest AP, kept from the last
+        # scan so a successful connect can persist a BSSID hint
+        self._scan_bssids = {}
+        # Gzipped JSON of the scan result, rebuilt only when the scan
+        # cache itself refreshes (matching _scan_ts marks it current)
+        self._scan_gz = None
+        self._scan_gz_ts = -1
+
+        # Connection state machine, driven by the monitor() task:
+        # idle -> connecting -> connected -> disconnected -> (retry)
+        self._state = 'idle'
+        self._handlers = []
+        self._backoff = self.RECONNECT_DELAY_S
+        # True while a foreground connect() owns the driver, so the
+        # monitor task doesn't stomp it with a reconnect kick
+        self._fg_connect = False
     
-    def connect(self, ssid=None, password=None, timeout=None):
+    async def connect(self, ssid=None, password=None, timeout=None):
         """
         Connect to WiFi network.
         
+        Coroutine: the association wait yields to the event loop, so
+        the web server and automation loop keep running while the link
+        comes up (a portal-triggered reconnect no longer freezes the
+        UI for up to 15s).
+        
         Args:
             ssid: WiFi SSID (defaults to configured SSID)
             password: WiFi password (defaults to configured password)
@@ -35,44 +92,112 @@ class WiFiManager:
         Returns:
             True if connected, False otherwise
         """
-        if timeout is None:
-            timeout = self.CONNECT_TIMEOUT
+        # Mark the attempt so monitor() leaves the driver alone: a
+        # second sta.connect from the background task would replace
+        # this association mid-flight
+        self._fg_connect = True
+        self._set_state('connecting')
+        try:
+            if timeout is None:
+                timeout = self.CONNECT_TIMEOUT
         
-        if ssid is None:
-            ssid = instances.config.get_wifi_ssid()
-        if password is None:
-            password = instances.config.get_wifi_password()
+            if ssid is None:
+                ssid = instances.config.get_wifi_ssid()
+            if password is None:
+                password = instances.config.get_wifi_password()
         
-        print(f"Connecting to WiFi: {ssid}")
+            print(f"Connecting to WiFi: {ssid}")
         
-        # Activate station mode
-        self.sta.active(True)
+            # Activate station mode
+            self.sta.active(True)
         
-        # Disconnect if already connected
-        if self.sta.isconnected():
-            self.sta.disconnect()
-            time.sleep(0.5)
+            # Disconnect if already connected. The IDF driver accepts a new
+            # connect() as soon as the old link is down, so poll for that
+            # instead of the fixed 0.5s settle this path used to pay
+            if self.sta.isconnected():
+                self.sta.disconnect()
+                for _ in range(25):
+                    if not self.sta.isconnected():
+                        break
+                    await asyncio.sleep_ms(20)
+        
+            # Associate straight to the last-known AP when a BSSID hint for
+            # this SSID is on record - the driver then skips its
+            # full-channel scan, which dominates a typical reconnect
+            cfg = instances.config
+            hint = cfg.get_wifi_bssid_hint()
+            bssid = None
+            if hint and hint.get('ssid') == ssid:
+                try:
+                    bssid = binascii.unhexlify(hint['bssid'])
+                except (KeyError, ValueError):
+                    bssid = None
+        
+            # Connect
+            if bssid:
+                try:
+                    self.sta.connect(ssid, password, bssid=bssid)
+                except (TypeError, OSError):
+                    # Port without the bssid kwarg - plain connect
+                    bssid = None
+                    self.sta.connect(ssid, password)
+            else:
+                self.sta.connect(ssid, password)
+        
+            if not await self._wait_for_link(timeout):
+                if bssid:
+                    # Stale hint (AP replaced or moved): drop it and retry
+                    # once with the driver's full scan
+                    print("BSSID hint failed, retrying with a full scan...")
+                    cfg.set_wifi_bssid_hint(None)
+                    cfg.save_config()
+                    self.sta.connect(ssid, password)
+                    if not await self._wait_for_link(timeout):
+                        return False
+                else:
+                    return False
+        
+            print(f"Connected! IP: {self.sta.ifconfig()[0]}")
+            self.mode = 'sta'
+            self._set_state('connected')
+            self._backoff = self.RECONNECT_DELAY_S
+        
+            # Remember which AP this SSID lives on (known when a scan
+            # preceded the connect, i.e. the portal flow) so the next
+            # association can go straight to it
+            new_bssid = self._scan_bssids.get(ssid)
+            if new_bssid and (not hint or hint.get('bssid') != new_bssid
+                              or hint.get('ssid') != ssid):
+                cfg.set_wifi_bssid_hint({'ssid': ssid, 'bssid': new_bssid})
+                cfg.save_config()
+        
+            # Disable AP mode if it was active
+            if self.ap.active():
+                self.ap.active(False)
         
-        # Connect
-        self.sta.connect(ssid, password)
+            return True
+        finally:
+            self._fg_connect = False
+    
+    async def _wait_for_link(self, timeout):
+        """Poll until the STA link is up; False on timeout or failure.
         
-        # Wait for connection
-        start = time.time()
+        The esp32 port has no STA event callbacks (WLAN.irq is a
+        cc3200/WiPy API), so the link state is polled - but at 100ms
+        rather than 1s, bailing out as soon as the driver reports a
+        terminal status, so the happy path costs the real link-up time.
+        """
+        print(f"Waiting up to {timeout}s for link...")
+        deadline = time.ticks_add(time.ticks_ms(), timeout * 1000)
         while not self.sta.isconnected():
-            if time.time() - start > timeout:
+            status = self.sta.status()
+            if status in _STAT_FAILED:
+                print(f"WiFi connection failed (status {status})")
+                return False
+            if time.ticks_diff(deadline, time.ticks_ms()) <= 0:
                 print(f"WiFi connection timeout after {timeout}s")
                 return False
-            time.sleep(self.CONNECT_RETRY_DELAY)
-            print(".", end="")
-        
-        print()
-        print(f"Connected! IP: {self.sta.ifconfig()[0]}")
-        self.mode = 'sta'
-        
-        # Disable AP mode if it was active
-        if self.ap.active():
-            self.ap.active(False)
-        
+            await asyncio.sleep_ms(self.CONNECT_POLL_MS)
         return True
     
     def start_ap_mode(self, ssid=None, password=None):
@@ -108,8 +233,11 @@ class WiFiManager:
             authmode=self.AP_AUTHMODE
         )
         
-        # Wait for AP to be ready
-        time.sleep(1)
+        # Wait for the AP to come up - usually <100ms, so a bounded
+        # poll beats the fixed 1s sleep this path used to pay
+        deadline = time.ticks_add(time.ticks_ms(), 2000)
+        while not self.ap.active() and time.ticks_diff(deadline, time.ticks_ms()) > 0:
+            time.sleep_ms(20)
         
         if self.ap.active():
             print(f"AP started! IP: {self.ap.ifconfig()[0]}")
@@ -120,21 +248,85 @@ class WiFiManager:
             print("Failed to start AP mode")
             return False
     
-    def connect_with_fallback(self):
+    def add_connection_handler(self, callback):
+        """Register a callback for connection state transitions.
+        
+        Args:
+            callback: Called as callback(old_state, new_state) with
+                states from: 'idle', 'connecting', 'connected',
+                'disconnected'
+        """
+        self._handlers.append(callback)
+    
+    def _set_state(self, new_state):
+        """Transition the state machine and notify registered handlers."""
+        old_state = self._state
+        if new_state == old_state:
+            return
+        self._state = new_state
+        for callback in self._handlers:
+            try:
+                callback(old_state, new_state)
+            except Exception as e:
+                print(f"WiFi state handler error: {e}")
+    
+    async def monitor(self):
+        """Background task: detect STA drops and reconnect with backoff.
+        
+        connect_with_fallback only runs at boot, so without this a later
+        AP outage left the board offline until a manual restart. The
+        esp32 port has no WiFi event callbacks, so the link is polled at
+        a low rate; on a drop, the driver is re-kicked with exponential
+        backoff (1s doubling to 60s) until the link returns. Handlers
+        registered via add_connection_handler see every transition.
+        """
+        while True:
+            if self.mode == 'sta':
+                if self.sta.isconnected():
+                    self._set_state('connected')
+                    self._backoff = self.RECONNECT_DELAY_S
+                else:
+                    if self._fg_connect:
+                        # A foreground connect() (e.g. the portal
+                        # handler switching networks) owns the driver;
+                        # another sta.connect here would replace its
+                        # in-flight association with the old credentials
+                        await asyncio.sleep(1)
+                        continue
+                    if self._state in ('connected', 'idle'):
+                        print("WiFi connection lost, reconnecting...")
+                    self._set_state('disconnected')
+                    self._set_state('connecting')
+                    try:
+                        self.sta.connect(instances.config.get_wifi_ssid(),
+                                         instances.config.get_wifi_password())
+                    except OSError:
+                        pass  # Driver busy with a previous attempt
+                    await asyncio.sleep(self._backoff)
+                    self._backoff = min(self._backoff * 2, self.RECONNECT_DELAY_MAX_S)
+                    continue
+            await asyncio.sleep(self.MONITOR_INTERVAL_S)
+    
+    async def connect_with_fallback(self, ssid=None, password=None, ap_ssid=None):
         """
         Try to connect to configured WiFi.
         If connection fails, start AP mode for configuration.
         
+        Args:
+            ssid: WiFi SSID (defaults to configured SSID)
+            password: WiFi password (defaults to configured password)
+            ap_ssid: SSID for the fallback AP (defaults to hostname-based)
+        
         Returns:
             'sta' if connected to WiFi, 'ap' if in AP mode
         """
         # Try to connect to configured WiFi
-        if self.connect():
+        if await self.connect(ssid, password):
             return 'sta'
         
         # Connection failed, start AP mode
         print("WiFi connection failed, starting AP mode for setup...")
-        self.start_ap_mode()
+        self.start_ap_mode(ssid=ap_ssid)
         return 'ap'
     
     def get_mode(self):
@@ -157,47 +349,123 @@ class WiFiManager:
             return self.ap.ifconfig()[0]
         return None
     
-    def scan_networks(self):
+    # Scan-result cache lifetimes (milliseconds). Short while
+    # disconnected - that's the provisioning flow, where a current RF
+    # picture matters - and generous while connected, where a scan
+    # stalls live STA traffic for its full ~1.5s duration.
+    SCAN_TTL_CONNECTED_MS = 60_000
+    SCAN_TTL_DISCONNECTED_MS = 10_000
+
+    # Networks below this RSSI aren't realistically joinable; dropping
+    # them early keeps the sort, the dicts and the JSON payload small
+    MIN_RSSI = -85
+
+    def scan_networks(self, force=False, max_age_ms=None, top_k=None):
         """
         Scan for available WiFi networks.
         
+        Results are cached so repeated portal page loads don't trigger a
+        fresh ~1.5s radio scan while the user is typing credentials.
+        
+        Args:
+            force: Ignore the cache and scan now
+            max_age_ms: Cache lifetime override (defaults per connection state)
+            top_k: Return only the strongest N networks (None for all)
+        
         Returns:
-            List of tuples: (ssid, bssid, channel, RSSI, authmode, hidden)
+            List of dicts: {ssid, rssi, authmode, security}, strongest first
         """
+        if not force and self._scan_cache is not None:
+            if max_age_ms is None:
+                max_age_ms = (self.SCAN_TTL_CONNECTED_MS if self.is_connected()
+                              else self.SCAN_TTL_DISCONNECTED_MS)
+            if time.ticks_diff(time.ticks_ms(), self._scan_ts) < max_age_ms:
+                cached = self._scan_cache
+                return cached[:top_k] if top_k else cached
+
         if not self.sta.active():
             self.sta.active(True)
-            time.sleep(0.5)
+            # Bounded poll instead of a fixed 0.5s sleep - the
+            # interface is typically up within a few ticks
+            deadline = time.ticks_add(time.ticks_ms(), 1000)
+            while not self.sta.active() and time.ticks_diff(deadline, time.ticks_ms()) > 0:
+                time.sleep_ms(10)
         
         print("Scanning for WiFi networks...")
         networks = self.sta.scan()
         
-        # Convert to more readable format
+        # Score and sort as (rssi, net) tuples before building any
+        # dicts: tuple comparison is native (no lambda key per element),
+        # networks too weak to join are dropped before allocating
+        # anything for them, and SSIDs stay as bytes until they survive
+        # the filter
+        scored = [(net[3], net) for net in networks if net[3] > self.MIN_RSSI]
+        scored.sort(reverse=True)
+        
+        # Materialize dicts strongest-first, keeping only the best AP
+        # per SSID (multi-AP networks showed up once per BSSID)
         result = []
-        for net in networks:
-            ssid = net[0].decode('utf-8')
-            rssi = net[3]
+        seen = set()
+        bssids = {}
+        for rssi, net in scored:
+            raw_ssid = net[0]
+            if not raw_ssid or raw_ssid in seen:
+                continue
+            seen.add(raw_ssid)
+            ssid_str = raw_ssid.decode('utf-8')
+            bssids[ssid_str] = binascii.hexlify(net[1]).decode()
             authmode = net[4]
             result.append({
-                'ssid': ssid,
+                'ssid': ssid_str,
                 'rssi': rssi,
                 'authmode': authmode,
-                'security': self._authmode_to_string(authmode)
+                'security': (_AUTHMODES[authmode]
+                             if 0 <= authmode < len(_AUTHMODES) else 'Unknown')
             })
         
-        # Sort by signal strength
-        result.sort(key=lambda x: x['rssi'], reverse=True)
-        return result
+        self._scan_cache = result
+        self._scan_bssids = bssids
+        self._scan_ts = time.ticks_ms()
+        return result[:top_k] if top_k else result
+    
+    def rescan(self):
+        """Force a fresh scan, bypassing the cache."""
+        return self.scan_networks(force=True)
+    
+    def scan_networks_compressed(self, force=False, top_k=None):
+        """Scan and return the result as gzip-compressed JSON bytes.
+        
+        The network list crosses the slow SoftAP link during
+        provisioning and its SSID/security strings compress well, so
+        the HTTP handler can send this blob with Content-Encoding:
+        gzip. The blob is cached alongside the raw scan result and only
+        rebuilt when the scan itself refreshes.
+        
+        Returns:
+            Gzipped JSON bytes, or None if the port lacks deflate
+            (callers fall back to the plain scan_networks() payload)
+        """
+        result = self.scan_networks(force=force, top_k=top_k)
+        if self._scan_gz is not None and self._scan_gz_ts == self._scan_ts:
+            return self._scan_gz
+        try:
+            import deflate
+            import io
+        except ImportError:
+            return None
+        import json
+        buf = io.BytesIO()
+        with deflate.DeflateIO(buf, deflate.GZIP) as f:
+            f.write(json.dumps({"networks": result}).encode())
+        self._scan_gz = buf.getvalue()
+        self._scan_gz_ts = self._scan_ts
+        return self._scan_gz
     
     def _authmode_to_string(self, authmode):
         """Convert authmode number to string."""
-        modes = {
-            0: 'Open',
-            1: 'WEP',
-            2: 'WPA-PSK',
-            3: 'WPA2-PSK',
-            4: 'WPA/WPA2-PSK'
-        }
-        return modes.get(authmode, 'Unknown')
+        if 0 <= authmode < len(_AUTHMODES):
+            return _AUTHMODES[authmode]
+        return 'Unknown'
     
     def save_credentials(self, ssid, password):
         """
@@ -248,25 +516,28 @@ class WiFiManager:
         Returns:
             mDNS server instance or None if failed/unavailable
         """
+        if _mdns is None:
+            print("mDNS not available (requires esp32 port with mdns module)")
+            return None
+        
         if hostname is None:
             hostname = instances.config.get_hostname()
         
         try:
-            import mdns
-            mdns_server = mdns.Server()
+            mdns_server = _mdns.Server()
             mdns_server.start(hostname, "MicroPython ESP32 Automation")
             print(f"mDNS started: {hostname}.local")
             return mdns_server
-        except ImportError:
-            print("mDNS not available (requires esp32 port with mdns module)")
-            return None
         except Exception as e:
             print(f"Failed to start mDNS: {e}")
             return None
     
-    def setup_and_connect(self):
+    async def setup_and_connect(self):
         """Complete WiFi setup flow with hostname, connection, and mDNS.
         
+        Coroutine - boot-time callers without a running loop can use
+        setup_and_connect_sync().
+        
         This method handles the complete WiFi initialization sequence:
         1. Check if credentials are configured
         2. Set hostname
@@ -278,22 +549,34 @@ class WiFiManager:
                 - mode: 'sta' if connected to WiFi, 'ap' if in AP mode
                 - mdns_server: mDNS server instance (if in STA mode), None otherwise
         """
-        hostname = instances.config.get_hostname()
+        # Read the config once and hand explicit values down - each
+        # getter is an attribute chain plus a dict lookup, and connect /
+        # start_ap_mode would otherwise re-fetch the same values
+        cfg = instances.config
+        hostname = cfg.get_hostname()
+        ssid = cfg.get_wifi_ssid()
+        password = cfg.get_wifi_password()
+        ap_ssid = f"{hostname}-setup"
+        
         # Set hostname before connecting
         self.set_hostname(hostname)
         
         # Check if WiFi credentials are configured
-        if not instances.config.get_wifi_ssid() or not instances.config.get_wifi_password():
+        if not ssid or not password:
             print('WiFi credentials not configured, starting AP mode...')
-            self.start_ap_mode()
-            print(f"Connect to '{hostname}-setup' network to configure WiFi")
+            self.start_ap_mode(ssid=ap_ssid)
+            print(f"Connect to '{ap_ssid}' network to configure WiFi")
             mode = 'ap'
         else:
             # Try to connect with AP fallback
-            mode = self.connect_with_fallback()
+            mode = await self.connect_with_fallback(ssid, password, ap_ssid)
         
         # Setup mDNS (works in both STA and AP mode)
         mdns_server = self.setup_mdns(hostname)
         
         return mode, mdns_server
+    
+    def setup_and_connect_sync(self):
+        """Run setup_and_connect() to completion outside an event loop."""
+        return asyncio.run(self.setup_and_connect())
 